@@ -0,0 +1,110 @@
+"""Compare hash engines used to verify resources, across file sizes and block sizes.
+
+Usage: ``python benchmarks/hash_engines.py --help``.
+"""
+import typing as t
+import os
+import argparse
+import tempfile
+import time
+import functools
+
+from buscador import integrity
+
+
+MIB = 1024 * 1024
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse user arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+
+    parser.add_argument(
+        "--file-sizes-in-mib",
+        nargs="+",
+        default=[16, 256, 1024],
+        type=int,
+        help="Sizes of the (random) files to hash, in MiB.",
+    )
+
+    parser.add_argument(
+        "--block-sizes-in-mib",
+        nargs="+",
+        default=[4, 16, 64],
+        type=int,
+        help="Read block sizes of 'sha256', and chunk sizes of the alternative engines, in MiB.",
+    )
+
+    parser.add_argument(
+        "--n-jobs",
+        default=None,
+        type=int,
+        help="Number of chunks hashed in parallel. If not provided, use the number of CPUs.",
+    )
+
+    parser.add_argument(
+        "--repeats",
+        default=3,
+        type=int,
+        help="Number of runs of every configuration; the fastest one is reported.",
+    )
+
+    parser.add_argument(
+        "--tmp-dir",
+        default=None,
+        type=str,
+        help="Directory to write the benchmark files.",
+    )
+
+    return parser.parse_args()
+
+
+def get_engines(
+    block_size_in_mib: int, n_jobs: t.Optional[int]
+) -> t.Dict[str, t.Callable[[str], t.Any]]:
+    """Get every hash engine, configured with the provided block size."""
+    chunk_size = block_size_in_mib * MIB
+
+    return {
+        "sha256": functools.partial(
+            integrity.compute_resource_hash, read_block_size_in_mib=block_size_in_mib
+        ),
+        "blake2b_tree": functools.partial(
+            integrity.compute_blake2b_tree, chunk_size=chunk_size, n_jobs=n_jobs
+        ),
+        "sha256_chunks": functools.partial(
+            integrity.compute_sha256_chunks, chunk_size=chunk_size, n_jobs=n_jobs
+        ),
+    }
+
+
+def main() -> None:
+    """Run the benchmark."""
+    args = parse_args()
+
+    print(f"{'file size':>10}  {'block size':>10}  {'engine':<14}  {'seconds':>8}  {'MiB/s':>8}")
+
+    for file_size_in_mib in args.file_sizes_in_mib:
+        with tempfile.NamedTemporaryFile(dir=args.tmp_dir, suffix=".bin") as f_tmp:
+            for _ in range(file_size_in_mib):
+                f_tmp.write(os.urandom(MIB))
+
+            f_tmp.flush()
+
+            for block_size_in_mib in args.block_sizes_in_mib:
+                for engine, fn_hash in get_engines(block_size_in_mib, args.n_jobs).items():
+                    elapsed_seconds = float("inf")
+
+                    for _ in range(args.repeats):
+                        t_start = time.perf_counter()
+                        fn_hash(f_tmp.name)
+                        elapsed_seconds = min(elapsed_seconds, time.perf_counter() - t_start)
+
+                    print(
+                        f"{file_size_in_mib:>6} MiB  {block_size_in_mib:>6} MiB  {engine:<14}  "
+                        f"{elapsed_seconds:>8.3f}  {file_size_in_mib / elapsed_seconds:>8.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,31 @@
 """Fetch pretrained Ulysses resources from command line."""
+import typing as t
 import argparse
+import json
+import os
+import sys
 
 from . import download_resources
+from . import integrity
+from . import peers
+from . import bundle
+from . import registry_index
+from . import planning
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: t.Optional[t.Sequence[str]] = None) -> argparse.Namespace:
     """Parse user arguments."""
     parser = argparse.ArgumentParser(
         prog="python -m buscador",
         description=("Download resources for Ulysses project (from Brazil's Chamber of Deputies)."),
+        epilog=(
+            "other commands:\n"
+            "  python -m buscador serve --help    share a local cache with other nodes\n"
+            "  python -m buscador bundle --help   pack or install resources for offline hosts\n"
+            "  python -m buscador list --help     list registered resources\n"
+            "  python -m buscador search --help   search registered resources\n"
+            "  python -m buscador describe --help build the registry entry of a resource file"
+        ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
 
@@ -69,22 +86,529 @@ def parse_args() -> argparse.Namespace:
         help="If enabled, do not verify if downloaded file hash matches the expected value.",
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--hash-engine",
+        default="auto",
+        choices=integrity.HASH_ENGINES,
+        help=(
+            "Hash engine to verify downloaded files. Alternative engines verify registered "
+            "'sha256_chunks' or 'blake2b_tree' digests in parallel, falling back to SHA256. "
+            "If 'auto', use the first alternative digest registered for the resource."
+        ),
+    )
+
+    parser.add_argument(
+        "--chunk-store-dir",
+        default=None,
+        type=str,
+        help=(
+            "If provided, keep a deduplicated store of resource chunks in this directory, and "
+            "fetch only missing chunks for resources registered with a chunk list. This reduces "
+            "network transfers, but uses extra disk space."
+        ),
+    )
+
+    parser.add_argument(
+        "--peer-url",
+        action="append",
+        default=None,
+        type=str,
+        help=(
+            "Base URL of a local network peer sharing its cache (see 'python -m buscador "
+            "serve'). Peers are tried before the registered URLs, and compressed files are kept "
+            "to be shared in turn. Can be used multiple times."
+        ),
+    )
+
+    parser.add_argument(
+        "--mirror-url",
+        action="append",
+        default=None,
+        type=str,
+        help=(
+            "Base URL of a storage mirroring resources as '<mirror_url>/<resource_name><ext>' "
+            "(e.g., 's3://bucket/prefix' or 'file:///mnt/mirror'). Mirrors are tried before "
+            "the registered URLs. Can be used multiple times."
+        ),
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help=(
+            "If enabled, do not download anything; instead, show whether the resource is "
+            "cached, its size, estimated download time, and the free disk space."
+        ),
+    )
+
+    return parser.parse_args(argv)
+
+
+def parse_serve_args(argv: t.Optional[t.Sequence[str]] = None) -> argparse.Namespace:
+    """Parse user arguments for the ``serve`` command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m buscador serve",
+        description=(
+            "Share a local resource cache with other nodes over HTTP. Only resources matching "
+            "their registered SHA256 are served."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        "-d",
+        default="ulysses_resources",
+        type=str,
+        help="Directory with downloaded resources to share.",
+    )
+
+    parser.add_argument(
+        "--host",
+        default="0.0.0.0",
+        type=str,
+        help="Host address to listen to.",
+    )
+
+    parser.add_argument(
+        "--port",
+        "-p",
+        default=8765,
+        type=int,
+        help="Port to listen to.",
+    )
+
+    parser.add_argument(
+        "--chunk-store-dir",
+        default=None,
+        type=str,
+        help="If provided, also share chunks from this chunk store directory.",
+    )
+
+    return parser.parse_args(argv)
+
+
+def run_serve(argv: t.Sequence[str]) -> None:
+    """Share a local cache with other nodes."""
+    args = parse_serve_args(argv)
+    print(f"Sharing '{args.cache_dir}' at http://{args.host}:{args.port} (Ctrl+C to stop).")
+    peers.serve_cache(
+        cache_dir=args.cache_dir,
+        resource_configs=download_resources.DEFAULT_URIS,
+        host=args.host,
+        port=args.port,
+        chunk_store_dir=args.chunk_store_dir,
+    )
+
+
+def parse_bundle_args(argv: t.Optional[t.Sequence[str]] = None) -> argparse.Namespace:
+    """Parse user arguments for the ``bundle`` command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m buscador bundle",
+        description="Pack resources into a single file, or install them from it in offline hosts.",
+    )
+
+    subparsers = parser.add_subparsers(dest="bundle_command", required=True)
+
+    parser_create = subparsers.add_parser("create", help="Pack resources into a bundle.")
+
+    parser_create.add_argument(
+        "bundle_uri",
+        type=str,
+        help="Output bundle file.",
+    )
+
+    parser_create.add_argument(
+        "resources",
+        nargs="+",
+        type=str,
+        help=(
+            "Resources to pack, as 'task_name/resource_name', or 'task_name' to pack every "
+            "resource from a task."
+        ),
+    )
+
+    parser_create.add_argument(
+        "--cache-dir",
+        "-d",
+        default=None,
+        type=str,
+        help="Directory to look for resources (kept compressed) before downloading them.",
+    )
+
+    parser_create.add_argument(
+        "--timeout-limit",
+        "-t",
+        default=10,
+        type=int,
+        help="Timeout limit for stale downloads, in seconds.",
+    )
+
+    parser_create.add_argument(
+        "--disable-progress-bar",
+        action="store_true",
+        help="if enabled, do not show download progress bar.",
+    )
+
+    parser_install = subparsers.add_parser("install", help="Install resources from a bundle.")
+
+    parser_install.add_argument(
+        "bundle_uri",
+        type=str,
+        help="Bundle file to install resources from.",
+    )
+
+    parser_install.add_argument(
+        "--output-dir",
+        "-d",
+        default="ulysses_resources",
+        type=str,
+        help="Output directory to install resources.",
+    )
+
+    parser_install.add_argument(
+        "--jobs",
+        "-j",
+        default=None,
+        type=int,
+        help="Number of resources to install in parallel (default: number of CPUs).",
+    )
+
+    parser_install.add_argument(
+        "--ignore-cached-files",
+        action="store_true",
+        help="If enabled, install resources even if they exist locally.",
+    )
+
+    parser_install.add_argument(
+        "--keep-compressed-files",
+        action="store_true",
+        help="If enabled, keep any compressed files even before decompression.",
+    )
+
+    parser_install.add_argument(
+        "--ignore-resource-hash",
+        action="store_true",
+        help="If enabled, do not verify if resource hashes match the expected values.",
+    )
+
+    parser_install.add_argument(
+        "--trust-bundle-registry",
+        action="store_true",
+        help=(
+            "If enabled, install resources not registered locally, verifying them with the "
+            "registry entries packed in the bundle. Only use it for bundles from trusted sources."
+        ),
+    )
+
+    return parser.parse_args(argv)
+
+
+def run_bundle(argv: t.Sequence[str]) -> None:
+    """Create or install a resource bundle."""
+    args = parse_bundle_args(argv)
+
+    if args.bundle_command == "install":
+        installed_resources = bundle.install_bundle(
+            bundle_uri=args.bundle_uri,
+            output_dir=args.output_dir,
+            check_cached=not args.ignore_cached_files,
+            clean_compressed_files=not args.keep_compressed_files,
+            check_resource_hash=not args.ignore_resource_hash,
+            n_jobs=args.jobs,
+            trust_bundle_registry=args.trust_bundle_registry,
+        )
+        print(f"Installed {len(installed_resources)} resources in '{args.output_dir}'.")
+        return
+
+    resources: t.List[t.Tuple[str, str]] = []
+
+    for resource_id in args.resources:
+        task_name, _, resource_name = resource_id.partition("/")
+
+        if resource_name:
+            resources.append((task_name, resource_name))
+            continue
+
+        resources.extend(
+            (task_name, resource_name)
+            for resource_name in download_resources.get_task_available_resources(task_name)
+        )
+
+    bundle.create_bundle(
+        bundle_uri=args.bundle_uri,
+        resources=resources,
+        cache_dir=args.cache_dir,
+        show_progress_bar=not args.disable_progress_bar,
+        timeout_limit_seconds=args.timeout_limit,
+    )
+    print(f"Packed {len(resources)} resources in '{args.bundle_uri}'.")
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add registry index filter arguments to `parser`."""
+    parser.add_argument(
+        "--extension",
+        "-e",
+        default=None,
+        type=str,
+        help="Show only resources with this file extension (e.g., '.zip').",
+    )
+
+    parser.add_argument(
+        "--min-size",
+        default=None,
+        type=int,
+        help="Show only resources with at least this size, in bytes.",
+    )
+
+    parser.add_argument(
+        "--max-size",
+        default=None,
+        type=int,
+        help="Show only resources with at most this size, in bytes.",
+    )
+
+
+def _print_entries(entries: t.Iterable[registry_index.ResourceEntry]) -> None:
+    """Print registry index entries, one per line."""
+    for entry in entries:
+        size = f"\t{entry.size_in_bytes}" if entry.size_in_bytes is not None else ""
+        print(f"{entry.task_name}/{entry.resource_name}\t{entry.file_extension}{size}")
+
+
+def parse_list_args(argv: t.Optional[t.Sequence[str]] = None) -> argparse.Namespace:
+    """Parse user arguments for the ``list`` command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m buscador list",
+        description="List registered resources, as 'task_name/resource_name'.",
+    )
+
+    parser.add_argument(
+        "task_name",
+        nargs="?",
+        default=None,
+        type=str,
+        help="If provided, list only resources from this task.",
+    )
+
+    _add_filter_arguments(parser)
+
+    return parser.parse_args(argv)
+
+
+def run_list(argv: t.Sequence[str]) -> None:
+    """List registered resources."""
+    args = parse_list_args(argv)
+    index = download_resources.get_registry_index()
+
+    _print_entries(
+        index.filter(
+            task_name=args.task_name,
+            file_extension=args.extension,
+            min_size_in_bytes=args.min_size,
+            max_size_in_bytes=args.max_size,
+        )
+    )
+
+
+def parse_search_args(argv: t.Optional[t.Sequence[str]] = None) -> argparse.Namespace:
+    """Parse user arguments for the ``search`` command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m buscador search",
+        description=(
+            "Search registered resources by name (prefix, substring and fuzzy matches), by "
+            "SHA256, or by file content."
+        ),
+    )
+
+    query_group = parser.add_mutually_exclusive_group(required=True)
+
+    query_group.add_argument(
+        "query",
+        nargs="?",
+        default=None,
+        type=str,
+        help="Resource name (or part of it) to search for.",
+    )
+
+    query_group.add_argument(
+        "--sha256",
+        default=None,
+        type=str,
+        help="Find the resource with this SHA256.",
+    )
+
+    query_group.add_argument(
+        "--file",
+        default=None,
+        type=str,
+        help="Find the resource matching the SHA256 of this file.",
+    )
+
+    parser.add_argument(
+        "--task-name",
+        default=None,
+        type=str,
+        help="Show only resources from this task.",
+    )
+
+    parser.add_argument(
+        "--limit",
+        "-n",
+        default=None,
+        type=int,
+        help="Maximum number of resources to show.",
+    )
+
+    _add_filter_arguments(parser)
+
+    return parser.parse_args(argv)
+
+
+def run_search(argv: t.Sequence[str]) -> None:
+    """Search registered resources."""
+    args = parse_search_args(argv)
+    index = download_resources.get_registry_index()
+
+    if args.query is None:
+        if args.sha256 is not None:
+            entry = index.find_by_sha256(args.sha256)
+        else:
+            entry = index.identify_file(args.file)
+
+        _print_entries([entry] if entry is not None else [])
+        return
+
+    _print_entries(
+        index.search(
+            args.query,
+            limit=args.limit,
+            task_name=args.task_name,
+            file_extension=args.extension,
+            min_size_in_bytes=args.min_size,
+            max_size_in_bytes=args.max_size,
+        )
+    )
+
+
+def parse_describe_args(argv: t.Optional[t.Sequence[str]] = None) -> argparse.Namespace:
+    """Parse user arguments for the ``describe`` command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m buscador describe",
+        description=(
+            "Build the registry entry (SHA256, file extension, size and extracted size) of a "
+            "resource file, to register it in 'trusted_urls' directory alongside its URLs."
+        ),
+    )
+
+    parser.add_argument(
+        "file_uri",
+        type=str,
+        help="Resource file, as it will be downloaded (e.g., 'my_resource.zip').",
+    )
+
+    return parser.parse_args(argv)
+
+
+def run_describe(argv: t.Sequence[str]) -> None:
+    """Print the registry entry of a resource file."""
+    args = parse_describe_args(argv)
+    resource_name = os.path.splitext(os.path.basename(args.file_uri.strip()))[0]
+    resource_config = planning.describe_resource_file(args.file_uri)
+    print(json.dumps({resource_name: resource_config}, indent=2))
+
+
+def _format_size(size_in_bytes: t.Optional[float]) -> str:
+    """Format a size in bytes to a human-readable string."""
+    if size_in_bytes is None:
+        return "unknown"
+
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size_in_bytes < 1024:
+            return f"{size_in_bytes:.1f} {unit}"
+        size_in_bytes /= 1024
+
+    return f"{size_in_bytes:.1f} TiB"
+
+
+def print_download_plan(plan: planning.DownloadPlan) -> None:
+    """Print a download plan."""
+    for resource in plan.resources:
+        print(f"{resource.task_name}/{resource.resource_name}:")
+
+        if resource.is_cached:
+            print(f"  cached in '{resource.output_uri}'.")
+            continue
+
+        estimated_seconds = resource.estimated_seconds
+        print(f"  source: {resource.source_url}")
+        print(f"  download size: {_format_size(resource.download_size_in_bytes)}")
+        print(f"  extracted size: {_format_size(resource.extracted_size_in_bytes)}")
+        print(
+            "  estimated time: "
+            + (f"{estimated_seconds:.1f}s" if estimated_seconds is not None else "unknown")
+        )
+
+    print(f"Total download size: {_format_size(plan.download_size_in_bytes)}")
+    print(
+        f"Required disk space: {_format_size(plan.required_disk_space_in_bytes)}"
+        + (" (lower bound)" if plan.has_unknown_sizes else "")
+    )
+    print(f"Free disk space: {_format_size(plan.free_disk_space_in_bytes)}")
+
+    fits_in_disk = plan.fits_in_disk
+
+    if fits_in_disk is None:
+        print(
+            "Warning: disk space check is inconclusive, since some resource sizes are unknown "
+            "(download or extracted size). Totals are lower bounds."
+        )
+
+    elif not fits_in_disk:
+        print("Warning: not enough free disk space.")
+
+
+COMMANDS: t.Dict[str, t.Callable[[t.Sequence[str]], None]] = {
+    "serve": run_serve,
+    "bundle": run_bundle,
+    "list": run_list,
+    "search": run_search,
+    "describe": run_describe,
+}
 
 
 def main() -> None:
     """Fetch a resource."""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     args = parse_args()
 
+    if args.dry_run:
+        plan = planning.plan_download(
+            resources=[(args.task_name, args.resource_name)],
+            output_dir=args.output_dir,
+            check_cached=not args.ignore_cached_files,
+            probe_urls=True,
+            timeout_limit_seconds=args.timeout_limit,
+        )
+        print_download_plan(plan)
+        return
+
     has_succeed = download_resources.download_resource(
         task_name=args.task_name,
         resource_name=args.resource_name,
         output_dir=args.output_dir,
         show_progress_bar=not args.disable_progress_bar,
         check_cached=not args.ignore_cached_files,
-        clean_compressed_files=not args.keep_compressed_files,
+        clean_compressed_files=False if args.keep_compressed_files else None,
         check_resource_hash=not args.ignore_resource_hash,
         timeout_limit_seconds=args.timeout_limit,
+        chunk_store_dir=args.chunk_store_dir,
+        peer_urls=args.peer_url,
+        mirror_urls=args.mirror_url,
+        hash_engine=args.hash_engine,
     )
 
     if has_succeed:
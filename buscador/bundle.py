@@ -0,0 +1,351 @@
+"""Pack resources into a single bundle file, and install them in hosts without internet access."""
+import typing as t
+import os
+import json
+import hashlib
+import tempfile
+import warnings
+import zipfile
+import tarfile
+import concurrent.futures
+
+from . import download_resources
+from . import decompress
+from . import integrity
+
+
+BUNDLE_INDEX_NAME = "bundle_index.json"
+BUNDLE_FORMAT_VERSION = 1
+
+ResourceIdType = t.Tuple[str, str]
+
+
+def _get_member_name(task_name: str, resource_name: str, file_extension: str) -> str:
+    return f"resources/{task_name}/{resource_name}{file_extension}"
+
+
+def _get_resource_file(
+    task_name: str,
+    resource_name: str,
+    resource_config: t.Dict[str, t.Any],
+    cache_dir: t.Optional[str],
+    tmp_dir: str,
+    show_progress_bar: bool,
+    timeout_limit_seconds: int,
+) -> str:
+    """Find a verified resource file in `cache_dir`, or download it into `tmp_dir`."""
+    filename = f"{resource_name}{resource_config['file_extension']}"
+
+    if cache_dir is not None:
+        cached_uri = os.path.join(cache_dir, filename)
+        if os.path.isfile(cached_uri) and integrity.check_resource_hash(
+            cached_uri, resource_config["sha256"]
+        ):
+            return cached_uri
+
+    has_succeed = download_resources.download_resource(
+        task_name=task_name,
+        resource_name=resource_name,
+        output_dir=tmp_dir,
+        show_progress_bar=show_progress_bar,
+        check_cached=False,
+        clean_compressed_files=False,
+        check_resource_hash=True,
+        timeout_limit_seconds=timeout_limit_seconds,
+    )
+
+    if not has_succeed:
+        raise ConnectionError(f"Could not retrieve '{resource_name}' for '{task_name}' task.")
+
+    return os.path.join(tmp_dir, filename)
+
+
+def create_bundle(
+    bundle_uri: str,
+    resources: t.Iterable[ResourceIdType],
+    cache_dir: t.Optional[str] = None,
+    show_progress_bar: bool = True,
+    timeout_limit_seconds: int = 10,
+) -> None:
+    """Pack resources, with their registry entries, into a single bundle file.
+
+    The bundle is an uncompressed (stored) ZIP file, hence indexed and seekable: its
+    ``bundle_index.json`` member holds the registry entries of every packed resource, and
+    resources are stored as ``resources/<task_name>/<resource_name><file_extension>``.
+
+    Parameters
+    ----------
+    bundle_uri : str
+        Output bundle URI.
+
+    resources : iterable of tuple of (str, str)
+        (`task_name`, `resource_name`) pairs to pack.
+
+    cache_dir : str or None, default=None
+        Directory to look for resources before downloading them. Only resources kept in their
+        registered form (e.g., downloaded with ``clean_compressed_files=False``) and matching
+        their registered SHA256 are reused.
+
+    show_progress_bar: bool, default=True
+        If True, show download progress bar.
+
+    timeout_limit_seconds : int, default=10
+        Timeout limit for stale downloads, in seconds.
+
+    Returns
+    -------
+    None
+    """
+    bundle_index: t.Dict[str, t.Dict[str, t.Dict[str, t.Any]]] = {}
+
+    for task_name, resource_name in resources:
+        try:
+            resource_config = download_resources.DEFAULT_URIS[task_name][resource_name]
+
+        except KeyError as k_err:
+            raise ValueError(
+                f"Unknown resource '{resource_name}' for task '{task_name}'."
+            ) from k_err
+
+        bundle_index.setdefault(task_name, {})[resource_name] = resource_config
+
+    if cache_dir is not None:
+        cache_dir = os.path.realpath(os.path.expandvars(os.path.expanduser(cache_dir.strip())))
+
+    bundle_uri = os.path.realpath(os.path.expandvars(os.path.expanduser(bundle_uri.strip())))
+    bundle_dir = os.path.dirname(bundle_uri)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    f_tmp_fd, f_tmp_uri = tempfile.mkstemp(dir=bundle_dir, suffix=".tmp")
+    os.close(f_tmp_fd)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir, zipfile.ZipFile(
+            f_tmp_uri, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True
+        ) as f_bundle:
+            f_bundle.writestr(
+                BUNDLE_INDEX_NAME,
+                json.dumps({"version": BUNDLE_FORMAT_VERSION, "resources": bundle_index}),
+            )
+
+            for task_name, task_resources in bundle_index.items():
+                for resource_name, resource_config in task_resources.items():
+                    resource_uri = _get_resource_file(
+                        task_name=task_name,
+                        resource_name=resource_name,
+                        resource_config=resource_config,
+                        cache_dir=cache_dir,
+                        tmp_dir=tmp_dir,
+                        show_progress_bar=show_progress_bar,
+                        timeout_limit_seconds=timeout_limit_seconds,
+                    )
+                    member_name = _get_member_name(
+                        task_name, resource_name, resource_config["file_extension"]
+                    )
+                    f_bundle.write(resource_uri, arcname=member_name)
+
+        os.replace(f_tmp_uri, bundle_uri)
+
+    finally:
+        if os.path.isfile(f_tmp_uri):
+            os.remove(f_tmp_uri)
+
+
+def read_bundle_index(bundle_uri: str) -> t.Dict[str, t.Dict[str, t.Dict[str, t.Any]]]:
+    """Read registry entries of every resource packed in a bundle."""
+    with zipfile.ZipFile(bundle_uri) as f_bundle:
+        bundle_index = json.loads(f_bundle.read(BUNDLE_INDEX_NAME).decode("utf-8"))
+
+    if bundle_index.get("version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported bundle format version '{bundle_index.get('version')}' "
+            f"(expected '{BUNDLE_FORMAT_VERSION}')."
+        )
+
+    resource_index: t.Dict[str, t.Dict[str, t.Dict[str, t.Any]]] = bundle_index["resources"]
+    return resource_index
+
+
+def _get_output_uri(output_dir: str, resource_name: str, file_extension: str) -> t.Optional[str]:
+    """Get the output URI of a resource, or None if it would be placed outside `output_dir`."""
+    filename = f"{resource_name}{file_extension}"
+
+    if not filename or "/" in filename or "\\" in filename or filename in (".", ".."):
+        return None
+
+    output_uri = os.path.realpath(os.path.join(output_dir, filename))
+
+    if os.path.dirname(output_uri) != output_dir:
+        return None
+
+    return output_uri
+
+
+def _install_resource(
+    bundle_uri: str,
+    task_name: str,
+    resource_name: str,
+    resource_config: t.Dict[str, t.Any],
+    output_dir: str,
+    check_cached: bool,
+    clean_compressed_files: bool,
+    check_resource_hash: bool,
+) -> bool:
+    """Copy a single resource from a bundle while hashing it, then decompress it."""
+    f_extension = resource_config["file_extension"]
+    output_uri = _get_output_uri(output_dir, resource_name, f_extension)
+
+    if output_uri is None:
+        return False
+
+    if check_cached and download_resources.is_cached(output_uri):
+        return True
+
+    member_name = _get_member_name(task_name, resource_name, f_extension)
+    hasher = hashlib.sha256()
+    f_tmp_fd, f_tmp_uri = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+
+    try:
+        with os.fdopen(f_tmp_fd, "wb") as f_out:
+            try:
+                with zipfile.ZipFile(bundle_uri) as f_bundle, f_bundle.open(member_name) as f_in:
+                    for data_chunk in iter(lambda: f_in.read(16 * 1024 * 1024), b""):
+                        hasher.update(data_chunk)
+                        f_out.write(data_chunk)
+
+            except (zipfile.BadZipFile, KeyError):
+                # Note: corrupted bundle, or resource listed in the bundle index but missing.
+                return False
+
+        if check_resource_hash and hasher.hexdigest() != resource_config["sha256"]:
+            return False
+
+        os.replace(f_tmp_uri, output_uri)
+
+    finally:
+        if os.path.isfile(f_tmp_uri):
+            os.remove(f_tmp_uri)
+
+    try:
+        decompress.decompress(output_uri, clean_compressed_files=clean_compressed_files)
+
+    except (decompress.UnsafeArchiveError, zipfile.BadZipFile, tarfile.TarError, OSError):
+        # Note: unsafe or corrupted archives (e.g., with 'trust_bundle_registry=True').
+        if os.path.isfile(output_uri):
+            os.remove(output_uri)
+
+        return False
+
+    return True
+
+
+def install_bundle(
+    bundle_uri: str,
+    output_dir: str = ".",
+    check_cached: bool = True,
+    clean_compressed_files: bool = True,
+    check_resource_hash: bool = True,
+    n_jobs: t.Optional[int] = None,
+    trust_bundle_registry: bool = False,
+) -> t.List[ResourceIdType]:
+    """Install every resource packed in a bundle, as if downloaded with ``download_resource``.
+
+    Resources are copied, verified and decompressed in parallel, each in a single read pass
+    over the bundle. Expected hashes are taken from the local registry: a bundle can not vouch
+    for its own content, hence resources unknown locally are skipped, unless
+    `trust_bundle_registry=True`.
+
+    Parameters
+    ----------
+    bundle_uri : str
+        Bundle URI, created by ``create_bundle``.
+
+    output_dir : str, default="."
+        Directory to install resources into.
+
+    check_cached : bool, default=True
+        If True, do not install resources already found in `output_dir`.
+
+    clean_compressed_files : bool, default=True
+        If True, delete compressed files after decompression.
+
+    check_resource_hash : bool, default=True
+        If True, verify if every resource hash (SHA256) matches the correct value.
+
+    n_jobs : int or None, default=None
+        Number of resources to install in parallel. If None, use the number of CPUs.
+
+    trust_bundle_registry : bool, default=False
+        If True, install resources unknown locally, verifying them with the registry entries
+        packed in the bundle. Only enable it for bundles from trusted sources.
+
+    Returns
+    -------
+    installed_resources : list of tuple of (str, str)
+        (`task_name`, `resource_name`) pairs installed successfully, or found locally when
+        `check_cached=True`.
+    """
+    bundle_uri = os.path.realpath(os.path.expandvars(os.path.expanduser(bundle_uri.strip())))
+    output_dir = os.path.realpath(os.path.expandvars(os.path.expanduser(output_dir.strip())))
+    os.makedirs(output_dir, exist_ok=True)
+
+    bundle_index = read_bundle_index(bundle_uri)
+    futures: t.Dict["concurrent.futures.Future[bool]", ResourceIdType] = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        for task_name, task_resources in bundle_index.items():
+            for resource_name, bundle_config in task_resources.items():
+                resource_config = download_resources.DEFAULT_URIS.get(task_name, {}).get(
+                    resource_name
+                )
+
+                if resource_config is None and not trust_bundle_registry:
+                    warnings.warn(
+                        message=(
+                            f"Resource '{resource_name}' for '{task_name}' task is not registered "
+                            "locally. Skipping it (use 'trust_bundle_registry=True' to verify it "
+                            "with the bundle registry entry instead)."
+                        ),
+                        category=RuntimeWarning,
+                    )
+                    continue
+
+                if resource_config is None:
+                    warnings.warn(
+                        message=(
+                            f"Resource '{resource_name}' for '{task_name}' task is not registered "
+                            "locally. Verifying it with the bundle registry entry instead."
+                        ),
+                        category=RuntimeWarning,
+                    )
+                    resource_config = bundle_config
+
+                future = executor.submit(
+                    _install_resource,
+                    bundle_uri=bundle_uri,
+                    task_name=task_name,
+                    resource_name=resource_name,
+                    resource_config=resource_config,
+                    output_dir=output_dir,
+                    check_cached=check_cached,
+                    clean_compressed_files=clean_compressed_files,
+                    check_resource_hash=check_resource_hash,
+                )
+                futures[future] = (task_name, resource_name)
+
+    installed_resources: t.List[ResourceIdType] = []
+
+    for future, (task_name, resource_name) in futures.items():
+        if future.result():
+            installed_resources.append((task_name, resource_name))
+            continue
+
+        warnings.warn(
+            message=(
+                f"Corrupted, missing, unsafe or unmatched resource hash (SHA256) for "
+                f"'{resource_name}' ('{task_name}' task) in bundle. Skipping it."
+            ),
+            category=RuntimeWarning,
+        )
+
+    return installed_resources
@@ -0,0 +1,340 @@
+"""Content-defined chunk store to deduplicate resources on disk and over the network."""
+import typing as t
+import os
+import hashlib
+import tempfile
+import urllib.request
+
+import tqdm
+
+
+ChunkListType = t.Sequence[t.Dict[str, t.Any]]
+
+
+def _build_cut_table() -> bytes:
+    """Build a deterministic translation table mapping half of the bytes to 1, and half to 0.
+
+    Bytes are picked pseudorandomly, so that every translated byte is a fair coin flip.
+    """
+    shuffled = sorted(range(256), key=lambda i: hashlib.sha256(i.to_bytes(2, "little")).digest())
+    ones = set(shuffled[:128])
+    return bytes(int(i in ones) for i in range(256))
+
+
+CUT_TABLE = _build_cut_table()
+
+
+def get_anchor_length(min_chunk_size: int, avg_chunk_size: int) -> int:
+    """Get the anchor length yielding chunks of `avg_chunk_size` bytes on average.
+
+    The first run of `k` ones in a sequence of fair coin flips is expected after ``2^(k + 1)``
+    flips, starting after `min_chunk_size` bytes.
+    """
+    return max(1, (max(2, avg_chunk_size - min_chunk_size)).bit_length() - 2)
+
+
+def _find_cut_point(
+    bits: bytes, *, start: int, length: int, min_chunk_size: int, max_chunk_size: int, anchor: bytes
+) -> int:
+    """Find the next cut point in already translated data, from `start` up to `length` bytes."""
+    if length <= min_chunk_size:
+        return length
+
+    end = min(length, max_chunk_size)
+    anchor_start = bits.find(anchor, start + min_chunk_size, start + end)
+
+    return end if anchor_start < 0 else anchor_start - start + len(anchor)
+
+
+def find_cut_point(
+    data: bytes, min_chunk_size: int, max_chunk_size: int, anchor_length: int
+) -> int:
+    """Find the length of the next content-defined chunk at the start of `data`.
+
+    Every byte is translated into a pseudorandom bit (``CUT_TABLE``), and a chunk boundary is
+    declared right after the first run of `anchor_length` ones past `min_chunk_size` bytes.
+    Boundaries depend only on the last `anchor_length` bytes, hence shared content produces
+    the same boundaries in distinct files. Both the translation and the search run in C
+    (``bytes.translate`` and ``bytes.find``), at memory speed.
+
+    Parameters
+    ----------
+    data : bytes
+        Data to find the chunk boundary in.
+
+    min_chunk_size : int
+        Minimum chunk size, in bytes.
+
+    max_chunk_size : int
+        Maximum chunk size, in bytes.
+
+    anchor_length : int
+        Length of the run of ones declaring a boundary. See ``get_anchor_length``.
+
+    Returns
+    -------
+    cut_point : int
+        Length, in bytes, of the chunk starting at the beginning of `data`.
+    """
+    return _find_cut_point(
+        data[:max_chunk_size].translate(CUT_TABLE),
+        start=0,
+        length=len(data),
+        min_chunk_size=min_chunk_size,
+        max_chunk_size=max_chunk_size,
+        anchor=b"\x01" * anchor_length,
+    )
+
+
+def iter_file_chunks(
+    file_uri: str,
+    min_chunk_size: int = 256 * 1024,
+    avg_chunk_size: int = 1024 * 1024,
+    max_chunk_size: int = 4 * 1024 * 1024,
+) -> t.Iterator[bytes]:
+    """Split a file into content-defined chunks.
+
+    Identical runs of content in distinct files (e.g., the same member stored in two
+    archives) produce identical chunks, regardless of their offsets within each file.
+
+    Parameters
+    ----------
+    file_uri : str
+        File to split.
+
+    min_chunk_size : int, default=256 KiB
+        Minimum chunk size, in bytes.
+
+    avg_chunk_size : int, default=1 MiB
+        Expected chunk size, in bytes. Approximated by a power of 2 (past `min_chunk_size`).
+
+    max_chunk_size : int, default=4 MiB
+        Maximum chunk size, in bytes.
+
+    Yields
+    ------
+    chunk : bytes
+        Next file chunk.
+    """
+    if not 0 < min_chunk_size <= avg_chunk_size <= max_chunk_size:
+        raise ValueError(
+            "Chunk sizes must satisfy 0 < min_chunk_size <= avg_chunk_size <= max_chunk_size "
+            f"(got {min_chunk_size}, {avg_chunk_size}, {max_chunk_size})."
+        )
+
+    anchor = b"\x01" * get_anchor_length(min_chunk_size, avg_chunk_size)
+    read_block_size = 4 * max_chunk_size
+
+    # Note: data is translated once per read block, and chunks are sliced by offset, to avoid
+    # copying (and translating) the unconsumed tail of the buffer for every chunk.
+    buffer = bits = b""
+    offset = 0
+    reached_eof = False
+
+    with open(file_uri, "rb") as f_in:
+        while True:
+            if not reached_eof and len(buffer) - offset < max_chunk_size:
+                data_block = f_in.read(read_block_size)
+                reached_eof = not data_block
+                buffer = buffer[offset:] + data_block
+                bits = bits[offset:] + data_block.translate(CUT_TABLE)
+                offset = 0
+                continue
+
+            if offset >= len(buffer):
+                return
+
+            cut_point = _find_cut_point(
+                bits,
+                start=offset,
+                length=len(buffer) - offset,
+                min_chunk_size=min_chunk_size,
+                max_chunk_size=max_chunk_size,
+                anchor=anchor,
+            )
+            yield buffer[offset : offset + cut_point]
+            offset += cut_point
+
+
+class ChunkStore:
+    """Deduplicated on-disk storage of content-defined chunks, addressed by their SHA256.
+
+    Parameters
+    ----------
+    root_dir : str
+        Directory to store chunks in. Created if it does not exist.
+
+    min_chunk_size : int, default=256 KiB
+        Minimum chunk size, in bytes, used when adding files to the store.
+
+    avg_chunk_size : int, default=1 MiB
+        Expected chunk size, in bytes, used when adding files to the store.
+
+    max_chunk_size : int, default=4 MiB
+        Maximum chunk size, in bytes, used when adding files to the store.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        min_chunk_size: int = 256 * 1024,
+        avg_chunk_size: int = 1024 * 1024,
+        max_chunk_size: int = 4 * 1024 * 1024,
+    ):
+        root_dir = os.path.expandvars(os.path.expanduser(root_dir.strip()))
+        self.root_dir = os.path.realpath(root_dir)
+        self.min_chunk_size = int(min_chunk_size)
+        self.avg_chunk_size = int(avg_chunk_size)
+        self.max_chunk_size = int(max_chunk_size)
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def chunk_path(self, chunk_sha256: str) -> str:
+        """Get the path where the chunk with the provided SHA256 is (or would be) stored."""
+        return os.path.join(self.root_dir, chunk_sha256[:2], chunk_sha256)
+
+    def has_chunk(self, chunk_sha256: str) -> bool:
+        """Check whether a chunk is available in the store."""
+        return os.path.isfile(self.chunk_path(chunk_sha256))
+
+    def add_chunk(self, data: bytes, chunk_sha256: t.Optional[str] = None) -> str:
+        """Store a chunk, if not stored yet, and return its SHA256."""
+        chunk_sha256 = chunk_sha256 or hashlib.sha256(data).hexdigest()
+        output_uri = self.chunk_path(chunk_sha256)
+
+        if os.path.isfile(output_uri):
+            return chunk_sha256
+
+        output_dir = os.path.dirname(output_uri)
+        os.makedirs(output_dir, exist_ok=True)
+
+        f_tmp_fd, f_tmp_uri = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(f_tmp_fd, "wb") as f_tmp:
+                f_tmp.write(data)
+
+            os.replace(f_tmp_uri, output_uri)
+
+        finally:
+            if os.path.isfile(f_tmp_uri):
+                os.remove(f_tmp_uri)
+
+        return chunk_sha256
+
+    def add_file(self, file_uri: str) -> t.List[t.Dict[str, t.Any]]:
+        """Split a file into content-defined chunks and store the missing ones.
+
+        Returns
+        -------
+        chunk_list : list of dict
+            Ordered chunk list (``{"sha256": ..., "size": ...}``) to rebuild `file_uri`. This
+            is also the expected format for the ``chunks`` entry of a registered resource.
+        """
+        chunk_list: t.List[t.Dict[str, t.Any]] = []
+
+        for chunk in iter_file_chunks(
+            file_uri,
+            min_chunk_size=self.min_chunk_size,
+            avg_chunk_size=self.avg_chunk_size,
+            max_chunk_size=self.max_chunk_size,
+        ):
+            chunk_sha256 = self.add_chunk(chunk)
+            chunk_list.append({"sha256": chunk_sha256, "size": len(chunk)})
+
+        return chunk_list
+
+    def missing_chunks(self, chunk_list: ChunkListType) -> t.List[t.Dict[str, t.Any]]:
+        """Get unique chunks from `chunk_list` not available in the store."""
+        missing: t.Dict[str, t.Dict[str, t.Any]] = {}
+
+        for chunk_config in chunk_list:
+            chunk_sha256 = chunk_config["sha256"]
+            if chunk_sha256 not in missing and not self.has_chunk(chunk_sha256):
+                missing[chunk_sha256] = chunk_config
+
+        return list(missing.values())
+
+    def fetch_chunks(
+        self,
+        chunk_list: ChunkListType,
+        chunk_urls: t.Sequence[str],
+        show_progress_bar: bool = True,
+        timeout_limit_seconds: int = 10,
+    ) -> None:
+        """Download every chunk from `chunk_list` missing in the store.
+
+        Chunk ``<sha256>`` is fetched from ``<chunk_url>/<sha256[:2]>/<sha256>``, trying every
+        URL from `chunk_urls` in order. This matches the store layout, hence any chunk store
+        directory can be published as a chunk mirror.
+
+        Raises
+        ------
+        ConnectionError
+            If any chunk could not be retrieved with the expected SHA256 from any URL.
+        """
+        missing = self.missing_chunks(chunk_list)
+
+        if not missing:
+            return
+
+        pbar = None
+
+        if show_progress_bar:
+            pbar = tqdm.tqdm(
+                total=sum(int(chunk_config.get("size", 0)) for chunk_config in missing),
+                unit_scale=True,
+                unit_divisor=1024,
+                unit="B",
+                desc=f"Downloading {len(missing)} chunks",
+            )
+
+        try:
+            for chunk_config in missing:
+                chunk_sha256 = chunk_config["sha256"]
+                data = self._fetch_chunk(chunk_sha256, chunk_urls, timeout_limit_seconds)
+                self.add_chunk(data, chunk_sha256=chunk_sha256)
+
+                if pbar is not None:
+                    pbar.update(len(data))
+
+        finally:
+            if pbar is not None:
+                pbar.close()
+
+    @staticmethod
+    def _fetch_chunk(
+        chunk_sha256: str, chunk_urls: t.Sequence[str], timeout_limit_seconds: int
+    ) -> bytes:
+        """Fetch a single chunk, verifying its SHA256."""
+        for chunk_url in chunk_urls:
+            chunk_url = f"{chunk_url.strip().rstrip('/')}/{chunk_sha256[:2]}/{chunk_sha256}"
+
+            try:
+                with urllib.request.urlopen(chunk_url, timeout=timeout_limit_seconds) as f_in:
+                    data = bytes(f_in.read())
+
+            except (OSError, ValueError):
+                continue
+
+            if hashlib.sha256(data).hexdigest() == chunk_sha256:
+                return data
+
+        raise ConnectionError(f"Could not retrieve chunk '{chunk_sha256}' from any chunk URL.")
+
+    def assemble(self, chunk_list: ChunkListType, output_uri: str) -> None:
+        """Rebuild a file from its chunk list. Every chunk must be available in the store."""
+        output_dir = os.path.dirname(os.path.realpath(output_uri))
+        f_tmp_fd, f_tmp_uri = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(f_tmp_fd, "wb") as f_out:
+                for chunk_config in chunk_list:
+                    with open(self.chunk_path(chunk_config["sha256"]), "rb") as f_chunk:
+                        f_out.write(f_chunk.read())
+
+            os.replace(f_tmp_uri, output_uri)
+
+        finally:
+            if os.path.isfile(f_tmp_uri):
+                os.remove(f_tmp_uri)
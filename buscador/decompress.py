@@ -2,6 +2,11 @@
 import typing as t
 import re
 import os
+import glob
+import posixpath
+import shutil
+import tempfile
+import time
 
 import zipfile
 import tarfile
@@ -14,9 +19,260 @@ COMPRESSION_ALG: t.Dict[str, t.Type[t.Any]] = {
 
 RE_GET_EXT = re.compile(r"\.(.*)$")
 
+STAGING_DIR_SUFFIX = ".staging"
+STALE_STAGING_DIR_AGE_IN_SECONDS = 24 * 60 * 60
+COPY_BUFFER_SIZE_IN_BYTES = 4 * 1024 * 1024
 
-def decompress(output_uri: str, clean_compressed_files: bool = False) -> None:
-    """Decompress a compressed file."""
+
+class UnsafeArchiveError(ValueError):
+    """Compressed file has members that would be extracted outside of the output directory."""
+
+
+def get_uncompressed_size(output_uri: str) -> t.Optional[int]:
+    """Get the total size of the members of a compressed file, in bytes.
+
+    Returns None if `output_uri` is not a supported compressed file.
+    """
+    match_file_ext = RE_GET_EXT.search(os.path.basename(output_uri))
+
+    if not match_file_ext or match_file_ext.group(1) not in COMPRESSION_ALG:
+        return None
+
+    if match_file_ext.group(1) == "zip":
+        with zipfile.ZipFile(output_uri) as f_zip:
+            return sum(member.file_size for member in f_zip.infolist())
+
+    with tarfile.TarFile(output_uri) as f_tar:
+        return sum(member.size for member in f_tar.getmembers() if member.isfile())
+
+
+def _is_within(root_dir: str, path: str) -> bool:
+    """Check whether `path` (after resolving links) is strictly within `root_dir`."""
+    return os.path.realpath(path).startswith(os.path.join(root_dir, ""))
+
+
+def _get_safe_path(root_dir: str, member_name: str, is_dir: bool = False) -> t.Optional[str]:
+    """Get the extraction path of a member, ensuring it is within `root_dir`.
+
+    Directory members naming `root_dir` itself (e.g., ``./``, as produced by ``tar -C dir .``)
+    are valid, but there is nothing to extract for them, hence None is returned.
+    """
+    normalized_name = member_name.replace("\\", "/")
+
+    is_unsafe = (
+        os.path.isabs(normalized_name)
+        or bool(os.path.splitdrive(normalized_name)[0])
+        or ".." in normalized_name.split("/")
+    )
+
+    if not is_unsafe and is_dir and posixpath.normpath(normalized_name) == ".":
+        return None
+
+    if is_unsafe or not _is_within(root_dir, os.path.join(root_dir, normalized_name)):
+        raise UnsafeArchiveError(f"Unsafe member path in compressed file: '{member_name}'.")
+
+    return os.path.realpath(os.path.join(root_dir, normalized_name))
+
+
+def _write_member(
+    f_in: t.IO[bytes], member_path: str, size_in_bytes: int, mode: t.Optional[int] = None
+) -> None:
+    """Write a member to `member_path`, preallocating its size in the file system beforehand."""
+    os.makedirs(os.path.dirname(member_path), exist_ok=True)
+
+    with open(member_path, "wb") as f_out:
+        if size_in_bytes > 0 and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(f_out.fileno(), 0, size_in_bytes)
+
+            except OSError:
+                # Note: preallocation is an optimization, and unsupported by some file systems.
+                pass
+
+        shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE_IN_BYTES)
+
+    if mode is not None:
+        os.chmod(member_path, mode)
+
+
+def _extract_zip(compressed_uri: str, staging_dir: str) -> t.List[str]:
+    """Extract a zip file into `staging_dir`, returning the URIs of the extracted files."""
+    file_uris: t.List[str] = []
+
+    with zipfile.ZipFile(compressed_uri) as f_zip:
+        for member in f_zip.infolist():
+            member_path = _get_safe_path(staging_dir, member.filename, is_dir=member.is_dir())
+
+            if member_path is None:
+                continue
+
+            if member.is_dir():
+                os.makedirs(member_path, exist_ok=True)
+                continue
+
+            with f_zip.open(member) as f_in:
+                _write_member(f_in, member_path, size_in_bytes=member.file_size)
+
+            file_uris.append(member_path)
+
+    return file_uris
+
+
+def _extract_tar(compressed_uri: str, staging_dir: str) -> t.List[str]:
+    """Extract a tar file into `staging_dir`, returning the URIs of the extracted files."""
+    file_uris: t.List[str] = []
+
+    with tarfile.TarFile(compressed_uri) as f_tar:
+        for member in f_tar:
+            member_path = _get_safe_path(staging_dir, member.name, is_dir=member.isdir())
+
+            if member_path is None:
+                continue
+
+            if member.isdir():
+                os.makedirs(member_path, exist_ok=True)
+                continue
+
+            if member.issym():
+                link_target = os.path.join(os.path.dirname(member_path), member.linkname)
+
+                if os.path.isabs(member.linkname) or not _is_within(staging_dir, link_target):
+                    raise UnsafeArchiveError(
+                        f"Unsafe link in compressed file: '{member.name}' -> '{member.linkname}'."
+                    )
+
+                os.makedirs(os.path.dirname(member_path), exist_ok=True)
+                os.symlink(member.linkname, member_path)
+                continue
+
+            if member.islnk():
+                link_target_path = t.cast(str, _get_safe_path(staging_dir, member.linkname))
+                os.makedirs(os.path.dirname(member_path), exist_ok=True)
+                os.link(link_target_path, member_path)
+                continue
+
+            if not member.isfile():
+                raise UnsafeArchiveError(
+                    f"Unsupported member type in compressed file: '{member.name}'."
+                )
+
+            f_in = f_tar.extractfile(member)
+
+            if f_in is None:
+                raise tarfile.ExtractError(f"Could not read member '{member.name}'.")
+
+            with f_in:
+                _write_member(
+                    f_in,
+                    member_path,
+                    size_in_bytes=member.size,
+                    mode=member.mode & 0o777,
+                )
+
+            os.utime(member_path, (member.mtime, member.mtime))
+            file_uris.append(member_path)
+
+    return file_uris
+
+
+def _fsync(uri: str) -> None:
+    """Flush a file (or directory) to disk. Failures are ignored (e.g., directories on Windows)."""
+    try:
+        f_fd = os.open(uri, os.O_RDONLY)
+
+    except OSError:
+        return
+
+    try:
+        os.fsync(f_fd)
+
+    except OSError:
+        pass
+
+    finally:
+        os.close(f_fd)
+
+
+def _sync_extracted_files(staging_dir: str, file_uris: t.Sequence[str]) -> None:
+    """Flush every extracted file, then every staged directory, to disk in a single pass."""
+    for file_uri in file_uris:
+        _fsync(file_uri)
+
+    for dir_uri, _, _ in os.walk(staging_dir):
+        _fsync(dir_uri)
+
+
+def _promote_staged_entries(staging_dir: str, output_dir: str, replaced_dir: str) -> t.Set[str]:
+    """Merge the tree in `staging_dir` into `output_dir`, with atomic renames.
+
+    Staged directories are merged into existing directories, hence archives sharing top-level
+    directories (e.g., ``models/a`` and ``models/b``) are kept side by side. Entries are moved
+    as a whole from the first path component missing in `output_dir`, and existing entries are
+    only replaced by staged entries with the exact same path. Replaced entries whose type
+    changed (e.g., a directory replaced by a file) are moved into `replaced_dir`, to be removed
+    afterwards.
+
+    Returns
+    -------
+    modified_dirs : set of str
+        Directories of `output_dir` whose entries were modified.
+    """
+    modified_dirs: t.Set[str] = set()
+
+    for name in os.listdir(staging_dir):
+        staged_path = os.path.join(staging_dir, name)
+        output_path = os.path.join(output_dir, name)
+
+        is_staged_dir = os.path.isdir(staged_path) and not os.path.islink(staged_path)
+        is_output_dir = os.path.isdir(output_path) and not os.path.islink(output_path)
+
+        if is_staged_dir and is_output_dir:
+            modified_dirs.update(_promote_staged_entries(staged_path, output_path, replaced_dir))
+            continue
+
+        if os.path.lexists(output_path) and (is_staged_dir or is_output_dir):
+            os.makedirs(replaced_dir, exist_ok=True)
+            os.replace(output_path, tempfile.mkdtemp(dir=replaced_dir))
+
+        os.replace(staged_path, output_path)
+        modified_dirs.add(output_dir)
+
+    return modified_dirs
+
+
+def decompress(
+    output_uri: str, clean_compressed_files: bool = False, sync_to_disk: bool = True
+) -> None:
+    """Decompress a compressed file, atomically.
+
+    Members are extracted into a hidden staging directory next to `output_uri`, and only moved
+    into place (renamed) once every member has been extracted. Hence, interrupted extractions
+    never leave partially extracted resources behind, which would be mistaken for cached ones.
+
+    Parameters
+    ----------
+    output_uri : str
+        Compressed file URI. Files not ending with a supported extension (``.zip`` or ``.tar``)
+        are ignored.
+
+    clean_compressed_files : bool, default=False
+        If True, delete compressed file after decompression.
+
+    sync_to_disk : bool, default=True
+        If True, flush extracted files to disk (in a single pass, after extraction) before
+        moving them into place, so they survive system crashes as well.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    UnsafeArchiveError
+        If any member would be extracted outside of the directory of `output_uri` (e.g., with
+        absolute paths, ``..`` components, or links pointing outside it), or is neither a
+        file, a directory or a link. Nothing is extracted in this case.
+    """
     output_uri = os.path.realpath(os.path.expanduser(output_uri))
     match_file_ext = RE_GET_EXT.search(output_uri)
 
@@ -28,11 +284,40 @@ def decompress(output_uri: str, clean_compressed_files: bool = False) -> None:
     if file_ext not in COMPRESSION_ALG:
         return
 
-    output_dir, _ = os.path.split(output_uri)
-    fn_compressed_file = COMPRESSION_ALG[file_ext]
+    output_dir, output_filename = os.path.split(output_uri)
+    staging_prefix = f".{output_filename}{STAGING_DIR_SUFFIX}-"
+
+    # Note: staging directories left behind by previously interrupted extractions. Recent ones
+    # may belong to concurrent extractions of the same file (e.g., in shared output directories).
+    stale_mtime = time.time() - STALE_STAGING_DIR_AGE_IN_SECONDS
+
+    for staging_dir in glob.glob(os.path.join(output_dir, f"{glob.escape(staging_prefix)}*")):
+        try:
+            if os.path.getmtime(staging_dir) < stale_mtime:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+        except OSError:
+            pass
+
+    staging_dir = tempfile.mkdtemp(dir=output_dir, prefix=staging_prefix)
+    replaced_dir = f"{staging_dir}-replaced"
+
+    try:
+        fn_extract = _extract_zip if file_ext == "zip" else _extract_tar
+        file_uris = fn_extract(output_uri, staging_dir)
+
+        if sync_to_disk:
+            _sync_extracted_files(staging_dir, file_uris)
+
+        modified_dirs = _promote_staged_entries(staging_dir, output_dir, replaced_dir)
+
+        if sync_to_disk:
+            for dir_uri in modified_dirs:
+                _fsync(dir_uri)
 
-    with fn_compressed_file(output_uri) as f_compressed:
-        f_compressed.extractall(path=output_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        shutil.rmtree(replaced_dir, ignore_errors=True)
 
     if clean_compressed_files:
         os.remove(output_uri)
@@ -8,17 +8,24 @@ import socket
 import contextlib
 import glob
 import shutil
+import time
 
 import tqdm
 
 from . import integrity
 from . import decompress
+from . import chunk_store
+from . import peers
+from . import user_cache
+from . import storage
+from . import registry_index
 
 
 __all__ = [
     "download_resource",
     "get_available_tasks",
     "get_task_available_resources",
+    "get_registry_index",
     "DEFAULT_URIS",
     "DEFAULT_URIS_CONFIG_DIR",
 ]
@@ -79,7 +86,8 @@ def download_file(
     Parameters
     ----------
     url : str
-        URL to download file from.
+        URL to download file from. Besides HTTP(S), supports every scheme with a registered
+        storage backend (see ``storage.BACKENDS``), such as ``file://`` and ``s3://``.
 
     output_uri : str
         Output URI (full path, ending with the filename and its extension) to save file.
@@ -119,13 +127,27 @@ def download_file(
         pbar.update(block_size)
 
     try:
-        with _set_connection_timeout(timeout_in_seconds=timeout_limit_seconds):
-            urllib.request.urlretrieve(
+        t_start = time.perf_counter()
+        storage_backend = storage.get_backend(url)
+
+        if storage_backend is not None:
+            storage_backend.fetch(
                 url=url,
-                filename=output_uri,
-                reporthook=fn_progress_bar if show_progress_bar else None,
+                output_uri=output_uri,
+                show_progress_bar=show_progress_bar,
+                timeout_limit_seconds=timeout_limit_seconds,
             )
 
+        else:
+            with _set_connection_timeout(timeout_in_seconds=timeout_limit_seconds):
+                urllib.request.urlretrieve(
+                    url=url,
+                    filename=output_uri,
+                    reporthook=fn_progress_bar if show_progress_bar else None,
+                )
+
+        elapsed_seconds = time.perf_counter() - t_start
+
     except Exception as err:
         if os.path.isfile(output_uri):
             os.remove(output_uri)
@@ -138,7 +160,12 @@ def download_file(
 
         raise KeyboardInterrupt from kbi_err
 
-    return
+    # Note: optional bookkeeping, recorded only after the download succeeded.
+    user_cache.record_download_throughput(
+        url=url,
+        size_in_bytes=os.path.getsize(output_uri),
+        elapsed_seconds=elapsed_seconds,
+    )
 
 
 def download_resource_from_url(
@@ -149,6 +176,9 @@ def download_resource_from_url(
     clean_compressed_files: bool = True,
     expected_resource_hash: t.Optional[str] = None,
     timeout_limit_seconds: int = 10,
+    expected_resource_digests: t.Optional[t.Mapping[str, t.Any]] = None,
+    hash_engine: str = "auto",
+    resource_chunk_store: t.Optional[chunk_store.ChunkStore] = None,
 ) -> None:
     """Download a resource from the provided `url`.
 
@@ -177,19 +207,24 @@ def download_resource_from_url(
     timeout_limit_seconds : int, default=10
         Timeout limit for stale downloads, in seconds.
 
+    expected_resource_digests : dict or None, default=None
+        Alternative digests (``sha256_chunks`` and ``blake2b_tree`` registry entries) of the
+        resource, verified in parallel instead of `expected_resource_hash` according to
+        `hash_engine`. Only used if `expected_resource_hash` is provided.
+
+    hash_engine : {'auto', 'sha256', 'sha256_chunks', 'blake2b_tree'}, default='auto'
+        Hash engine to verify the resource. See ``integrity.verify_resource``.
+
+    resource_chunk_store : chunk_store.ChunkStore or None, default=None
+        If provided, the downloaded resource is split into chunks and added to this store, so
+        later resources sharing content with it only need to fetch their missing chunks.
+
     Returns
     -------
     None
     """
-    if check_cached:
-        output_uri_noext = ".".join(output_uri.split(".")[:-1])
-
-        output_file_is_cached = any(
-            not (filename.endswith(".zip") or filename.endswith(".tar"))
-            for filename in glob.glob(f"{output_uri_noext}*")
-        )
-        if os.path.isdir(output_uri_noext) or output_file_is_cached:
-            return
+    if check_cached and is_cached(output_uri):
+        return
 
     download_file(
         url=resource_url,
@@ -199,8 +234,152 @@ def download_resource_from_url(
         timeout_limit_seconds=timeout_limit_seconds,
     )
 
-    hash_has_issues = expected_resource_hash is not None and not integrity.check_resource_hash(
-        resource_uri=output_uri, resource_hash=expected_resource_hash
+    _verify_and_decompress(
+        output_uri=output_uri,
+        clean_compressed_files=clean_compressed_files,
+        expected_resource_hash=expected_resource_hash,
+        expected_resource_digests=expected_resource_digests,
+        hash_engine=hash_engine,
+        resource_chunk_store=resource_chunk_store,
+    )
+
+
+def download_resource_from_chunks(
+    chunk_list: chunk_store.ChunkListType,
+    chunk_urls: t.Sequence[str],
+    resource_chunk_store: chunk_store.ChunkStore,
+    output_uri: str,
+    show_progress_bar: bool = True,
+    check_cached: bool = True,
+    clean_compressed_files: bool = True,
+    expected_resource_hash: t.Optional[str] = None,
+    timeout_limit_seconds: int = 10,
+    expected_resource_digests: t.Optional[t.Mapping[str, t.Any]] = None,
+    hash_engine: str = "auto",
+) -> None:
+    """Rebuild a resource from its chunk list, downloading only chunks missing locally.
+
+    Compressed files are decompressed.
+
+    Parameters
+    ----------
+    chunk_list : sequence of dict
+        Ordered chunks (``{"sha256": ..., "size": ...}``) composing the resource.
+
+    chunk_urls : sequence of str
+        Base URLs to download chunks from. Chunk ``<sha256>`` is fetched from
+        ``<chunk_url>/<sha256[:2]>/<sha256>``.
+
+    resource_chunk_store : chunk_store.ChunkStore
+        Local chunk store to reuse and save chunks.
+
+    output_uri : str
+        Output URI (full path, ending with the filename and its extension) to save resource.
+
+    show_progress_bar: bool, default=True
+        If True, show download progress bar.
+
+    check_cached : bool, default=True
+        If True, do not download file if a file with the same `output_uri` exists locally.
+
+    clean_compressed_files : bool, default=True
+        If True, delete compressed files after decompression.
+
+    expected_resource_hash : str or None, default=None
+        Check whether rebuilt resource hash matches the provided value.
+
+    timeout_limit_seconds : int, default=10
+        Timeout limit for stale downloads, in seconds.
+
+    expected_resource_digests : dict or None, default=None
+        Alternative digests (``sha256_chunks`` and ``blake2b_tree`` registry entries) of the
+        resource, verified in parallel instead of `expected_resource_hash` according to
+        `hash_engine`. Only used if `expected_resource_hash` is provided.
+
+    hash_engine : {'auto', 'sha256', 'sha256_chunks', 'blake2b_tree'}, default='auto'
+        Hash engine to verify the resource. See ``integrity.verify_resource``.
+
+    Returns
+    -------
+    None
+    """
+    if check_cached and is_cached(output_uri):
+        return
+
+    resource_chunk_store.fetch_chunks(
+        chunk_list=chunk_list,
+        chunk_urls=chunk_urls,
+        show_progress_bar=show_progress_bar,
+        timeout_limit_seconds=timeout_limit_seconds,
+    )
+    resource_chunk_store.assemble(chunk_list=chunk_list, output_uri=output_uri)
+
+    _verify_and_decompress(
+        output_uri=output_uri,
+        clean_compressed_files=clean_compressed_files,
+        expected_resource_hash=expected_resource_hash,
+        expected_resource_digests=expected_resource_digests,
+        hash_engine=hash_engine,
+    )
+
+
+def is_cached(output_uri: str) -> bool:
+    """Check whether a resource (or its decompressed content) is found locally.
+
+    Parameters
+    ----------
+    output_uri : str
+        Output URI of the resource, as downloaded (e.g., ``<output_dir>/<resource_name>.zip``).
+
+    Returns
+    -------
+    is_cached : bool
+        True if the resource file, or the directory it decompresses into, exists.
+    """
+    output_uri_noext = ".".join(output_uri.split(".")[:-1])
+
+    output_file_is_cached = any(
+        not (filename.endswith(".zip") or filename.endswith(".tar"))
+        for filename in glob.glob(f"{output_uri_noext}*")
+    )
+
+    return os.path.isdir(output_uri_noext) or output_file_is_cached
+
+
+def _is_valid_chunks_config(chunks_config: t.Any) -> bool:
+    """Check whether a ``chunks`` registry entry is well-formed."""
+    if not isinstance(chunks_config, dict):
+        return False
+
+    chunk_urls = chunks_config.get("urls")
+    chunk_list = chunks_config.get("list")
+
+    return (
+        isinstance(chunk_urls, list)
+        and isinstance(chunk_list, list)
+        and all(isinstance(chunk_url, str) for chunk_url in chunk_urls)
+        and all(
+            isinstance(chunk_config, dict)
+            and isinstance(chunk_config.get("sha256"), str)
+            and isinstance(chunk_config.get("size", 0), int)
+            for chunk_config in chunk_list
+        )
+    )
+
+
+def _verify_and_decompress(
+    output_uri: str,
+    clean_compressed_files: bool,
+    expected_resource_hash: t.Optional[str],
+    expected_resource_digests: t.Optional[t.Mapping[str, t.Any]] = None,
+    hash_engine: str = "auto",
+    resource_chunk_store: t.Optional[chunk_store.ChunkStore] = None,
+) -> None:
+    """Check the hash of a retrieved resource, then decompress it."""
+    hash_has_issues = expected_resource_hash is not None and not integrity.verify_resource(
+        resource_uri=output_uri,
+        resource_config={**(expected_resource_digests or {}), "sha256": expected_resource_hash},
+        hash_engine=hash_engine,
     )
 
     if hash_has_issues:
@@ -212,6 +391,9 @@ def download_resource_from_url(
 
         raise ResourceHashError
 
+    if resource_chunk_store is not None:
+        resource_chunk_store.add_file(output_uri)
+
     decompress.decompress(output_uri, clean_compressed_files=clean_compressed_files)
 
 
@@ -221,9 +403,13 @@ def download_resource(
     output_dir: str = ".",
     show_progress_bar: bool = True,
     check_cached: bool = True,
-    clean_compressed_files: bool = True,
+    clean_compressed_files: t.Optional[bool] = None,
     check_resource_hash: bool = True,
     timeout_limit_seconds: int = 10,
+    chunk_store_dir: t.Optional[str] = None,
+    peer_urls: t.Optional[t.Sequence[str]] = None,
+    mirror_urls: t.Optional[t.Sequence[str]] = None,
+    hash_engine: str = "auto",
 ) -> bool:
     """Download a resource from the provided (`task_name`, `resource_name`) pair.
 
@@ -247,8 +433,9 @@ def download_resource(
     check_cached : bool, default=True
         If True, do not download file if a file with the same `output_uri` exists locally.
 
-    clean_compressed_files : bool, default=True
-        If True, delete compressed files after decompression.
+    clean_compressed_files : bool or None, default=None
+        If True, delete compressed files after decompression. If None, delete them unless
+        `peer_urls` are provided.
 
     check_resource_hash : bool, default=True
         If True, verify if the downloaded resource hash (SHA256) matches the correct value.
@@ -256,6 +443,31 @@ def download_resource(
     timeout_limit_seconds : int, default=10
         Timeout limit for stale downloads, in seconds.
 
+    chunk_store_dir : str or None, default=None
+        If provided, keep a deduplicated store of resource chunks in this directory. Resources
+        registered with a ``chunks`` entry are rebuilt from local chunks, downloading only the
+        missing ones, before falling back to their ``urls``. Resources downloaded from ``urls``
+        are added to the store. This reduces network transfers, not disk usage: the store
+        keeps a (deduplicated) copy of every resource file, besides the extracted resource.
+
+    peer_urls : sequence of str or None, default=None
+        Base URLs of local network peers sharing their cache (see ``python -m buscador serve``).
+        Peers are tried in order before the registered URLs, and every resource retrieved
+        from them is still verified against its registered SHA256 (if `check_resource_hash`).
+        If provided, compressed files are kept by default (``clean_compressed_files=None``), so
+        this node can share them in turn.
+
+    mirror_urls : sequence of str or None, default=None
+        Base URLs of storages mirroring resources as ``<mirror_url>/<resource_name><extension>``,
+        such as an object store (``s3://<bucket>/<prefix>``) or a mounted file system
+        (``file:///<path>``). Mirrors are tried after peers and before the registered URLs.
+
+    hash_engine : {'auto', 'sha256', 'sha256_chunks', 'blake2b_tree'}, default='auto'
+        Hash engine used to verify resources (if `check_resource_hash`). Alternative engines
+        verify the ``sha256_chunks`` or ``blake2b_tree`` digests registered for the resource in
+        parallel, across CPU cores; resources without them are verified with SHA256. If
+        ``auto``, use the first alternative digest registered for the resource.
+
     Returns
     -------
     was_succeed : bool
@@ -278,13 +490,13 @@ def download_resource(
         resource_config: ResourceConfigType = resource_map[resource_name]
 
     except KeyError as k_err:
-        valid_resources = ", ".join(map("'{}'".format, sorted(resource_map.keys())))
+        raise ValueError(_build_unknown_resource_message(task_name, resource_name)) from k_err
 
+    if hash_engine not in integrity.HASH_ENGINES:
         raise ValueError(
-            f"Unknown resource '{resource_name}' for task '{task_name}'. Please verify if the "
-            f"provided task is correct ('{task_name}'). If that is the case, plase provide one of "
-            f"the following resources: {valid_resources}."
-        ) from k_err
+            f"Unknown hash engine '{hash_engine}'. Please provide one of the following: "
+            f"{', '.join(integrity.HASH_ENGINES)}."
+        )
 
     output_dir = output_dir.strip()
     output_dir = os.path.expanduser(output_dir)
@@ -294,10 +506,85 @@ def download_resource(
     os.makedirs(output_dir, exist_ok=True)
 
     resource_sha256 = resource_config["sha256"]
+    resource_digests = {
+        engine: resource_config[engine]
+        for engine in integrity.ALTERNATIVE_DIGESTS
+        if engine in resource_config
+    }
     f_extension = resource_config["file_extension"]
+    output_uri = os.path.join(output_dir, f"{resource_name}{f_extension}").strip()
+
+    resource_chunk_store = chunk_store.ChunkStore(chunk_store_dir) if chunk_store_dir else None
+    chunks_config: t.Optional[ResourceConfigType] = resource_config.get("chunks")
+    peer_urls = tuple(peer_urls or ())
+
+    if clean_compressed_files is None:
+        # Note: peers only share compressed files, so keep them to share them in turn.
+        clean_compressed_files = not peer_urls
+
+    if resource_chunk_store is not None and chunks_config and not _is_valid_chunks_config(
+        chunks_config
+    ):
+        warnings.warn(
+            message=(
+                f"Malformed 'chunks' registry entry for '{resource_name}' ('{task_name}' task). "
+                "Trying resource URLs."
+            ),
+            category=RuntimeWarning,
+        )
+        chunks_config = None
 
-    for resource_url in resource_config["urls"]:
-        output_uri = os.path.join(output_dir, f"{resource_name}{f_extension}").strip()
+    if resource_chunk_store is not None and chunks_config:
+        try:
+            download_resource_from_chunks(
+                chunk_list=chunks_config["list"],
+                chunk_urls=[
+                    *map(peers.get_peer_chunk_url, peer_urls),
+                    *chunks_config["urls"],
+                ],
+                resource_chunk_store=resource_chunk_store,
+                output_uri=output_uri,
+                show_progress_bar=show_progress_bar,
+                check_cached=check_cached,
+                clean_compressed_files=clean_compressed_files,
+                expected_resource_hash=resource_sha256 if check_resource_hash else None,
+                timeout_limit_seconds=timeout_limit_seconds,
+                expected_resource_digests=resource_digests,
+                hash_engine=hash_engine,
+            )
+            return True
+
+        except ConnectionError as conn_err:
+            warnings.warn(
+                message=(
+                    f"Could not retrieve '{resource_name}' for '{task_name}' task from its chunk "
+                    f"list (error message: {conn_err}). Trying resource URLs."
+                ),
+                category=RuntimeWarning,
+            )
+
+        except ResourceHashError:
+            warnings.warn(
+                message=(
+                    f"Unmatched resource hash (SHA256) for '{resource_name}' rebuilt from its "
+                    "chunk list. Trying resource URLs."
+                ),
+                category=RuntimeWarning,
+            )
+
+    candidate_urls = [
+        *(
+            (peers.get_peer_resource_url(peer_url, task_name, resource_name), True)
+            for peer_url in peer_urls
+        ),
+        *(
+            (storage.get_mirror_resource_url(mirror_url, resource_name, f_extension), True)
+            for mirror_url in mirror_urls or ()
+        ),
+        *((resource_url, False) for resource_url in resource_config["urls"]),
+    ]
+
+    for resource_url, is_optional_source in candidate_urls:
         resource_url = resource_url.strip()
 
         try:
@@ -309,9 +596,16 @@ def download_resource(
                 clean_compressed_files=clean_compressed_files,
                 expected_resource_hash=resource_sha256 if check_resource_hash else None,
                 timeout_limit_seconds=timeout_limit_seconds,
+                expected_resource_digests=resource_digests,
+                hash_engine=hash_engine,
+                resource_chunk_store=resource_chunk_store,
             )
 
         except (ConnectionError, urllib.error.URLError) as conn_err:
+            if is_optional_source:
+                # Note: peers or mirrors missing the requested resource are expected.
+                continue
+
             warnings.warn(
                 message=(
                     f"Could not retrieve '{resource_name}' for '{task_name}' task in "
@@ -339,9 +633,38 @@ def download_resource(
     return False
 
 
+def get_registry_index() -> registry_index.RegistryIndex:
+    """Get the compiled index of every registered resource (``DEFAULT_URIS``).
+
+    The index is compiled once per process. See ``registry_index.load_registry_index``.
+    """
+    return registry_index.load_registry_index(DEFAULT_URIS)
+
+
+def _build_unknown_resource_message(task_name: str, resource_name: str) -> str:
+    """Build the error message of an unknown resource, suggesting similar resource names."""
+    index = get_registry_index()
+    similar_entries = index.search(resource_name, task_name=task_name, limit=5)
+
+    if similar_entries:
+        suggestions = ", ".join(f"'{entry.resource_name}'" for entry in similar_entries)
+        return (
+            f"Unknown resource '{resource_name}' for task '{task_name}'. Did you mean one of "
+            f"the following resources: {suggestions}?"
+        )
+
+    valid_resources = ", ".join(map("'{}'".format, index.get_task_resource_names(task_name) or ()))
+
+    return (
+        f"Unknown resource '{resource_name}' for task '{task_name}'. Please verify if the "
+        f"provided task is correct ('{task_name}'). If that is the case, plase provide one of "
+        f"the following resources: {valid_resources}."
+    )
+
+
 def get_available_tasks() -> t.Tuple[str, ...]:
     """Get all available tasks to get resources from."""
-    return tuple(DEFAULT_URIS.keys())
+    return get_registry_index().task_names
 
 
 def get_task_available_resources(task_name: str) -> t.Tuple[str, ...]:
@@ -351,11 +674,13 @@ def get_task_available_resources(task_name: str) -> t.Tuple[str, ...]:
     --------
     get_available_tasks : get all available tasks.
     """
-    if task_name not in DEFAULT_URIS:
+    resource_names = get_registry_index().get_task_resource_names(task_name)
+
+    if resource_names is None:
         valid_tasks = ", ".join(get_available_tasks())
         raise ValueError(
             f"Unrecognized task name '{task_name}'. Please provide one of the following: "
             f"{valid_tasks}."
         )
 
-    return tuple(DEFAULT_URIS[task_name].keys())
+    return resource_names
@@ -1,6 +1,48 @@
 """Check integrity of downloaded resource."""
 import typing as t
+import os
 import hashlib
+import concurrent.futures
+
+
+ALTERNATIVE_DIGESTS = ("sha256_chunks", "blake2b_tree")
+"""Registry entries of alternative digests, verifiable in parallel, by order of preference."""
+
+HASH_ENGINES = ("auto", "sha256", *ALTERNATIVE_DIGESTS)
+
+
+def compute_resource_hash(
+    resource_uri: str,
+    read_block_size_in_mib: int = 256,
+    hash_fn: t.Callable[[], t.Any] = hashlib.sha256,
+) -> str:
+    """Compute the hash value (hex digest) of a file.
+
+    Parameters
+    ----------
+    resource_uri : str
+        File URI to compute hash from.
+
+    read_block_size_in_mib : int, default=256
+        Size of blocks to read `resource_uri` file, in MebiBytes (MiB).
+
+    hash_fn : t.Callable[[], t.Any], default=hashlib.sha256
+        Hash function to compute, from hashlib.
+
+    Returns
+    -------
+    resource_hash : str
+        Hex digest of `resource_uri`.
+    """
+    hasher = hash_fn()
+
+    read_block_size_in_b = 1024 * 1024 * read_block_size_in_mib
+
+    with open(resource_uri, "rb") as f_in:
+        for data_chunk in iter(lambda: f_in.read(read_block_size_in_b), b""):
+            hasher.update(data_chunk)
+
+    return str(hasher.hexdigest())
 
 
 def check_resource_hash(
@@ -34,12 +76,224 @@ def check_resource_hash(
     --------
     hashlib : Python's native package to compute hashes.
     """
-    hasher = hash_fn()
+    computed_hash = compute_resource_hash(
+        resource_uri=resource_uri,
+        read_block_size_in_mib=read_block_size_in_mib,
+        hash_fn=hash_fn,
+    )
 
-    read_block_size_in_b = 1024 * 1024 * read_block_size_in_mib
+    return computed_hash == resource_hash
 
-    with open(resource_uri, "rb") as f_in:
-        for data_chunk in iter(lambda: f_in.read(read_block_size_in_b), b""):
-            hasher.update(data_chunk)
 
-    return bool(hasher.hexdigest() == resource_hash)
+def _hash_file_chunks(
+    resource_uri: str,
+    chunk_size: int,
+    fn_hash_chunk: t.Callable[[int, int, t.BinaryIO], str],
+    n_jobs: t.Optional[int] = None,
+) -> t.List[str]:
+    """Hash every `chunk_size` chunk of a file in parallel, with ``fn_hash_chunk(i, n, f_in)``.
+
+    Files are read with one file handle per chunk, and ``hashlib`` releases the GIL while
+    hashing, hence chunks are hashed in parallel across CPU cores. Empty files have a single
+    empty chunk.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"Chunk size must be positive (got {chunk_size}).")
+
+    n_chunks = max(1, -(-os.path.getsize(resource_uri) // chunk_size))
+
+    def hash_chunk(chunk_index: int) -> str:
+        with open(resource_uri, "rb") as f_in:
+            f_in.seek(chunk_index * chunk_size)
+            return fn_hash_chunk(chunk_index, n_chunks, f_in)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        return list(executor.map(hash_chunk, range(n_chunks)))
+
+
+def _update_from_file(hasher: t.Any, f_in: t.BinaryIO, size: int) -> t.Any:
+    """Feed up to `size` bytes of `f_in` to `hasher`, in blocks of 4 MiB."""
+    read_block_size_in_b = 4 * 1024 * 1024
+
+    while size > 0:
+        data_chunk = f_in.read(min(size, read_block_size_in_b))
+        if not data_chunk:
+            break
+        hasher.update(data_chunk)
+        size -= len(data_chunk)
+
+    return hasher
+
+
+def compute_sha256_chunks(
+    resource_uri: str, chunk_size: int = 64 * 1024 * 1024, n_jobs: t.Optional[int] = None
+) -> t.List[str]:
+    """Compute the SHA256 of every `chunk_size` chunk of a file, in parallel.
+
+    Parameters
+    ----------
+    resource_uri : str
+        File URI to compute hashes from.
+
+    chunk_size : int, default=64 MiB
+        Chunk size, in bytes.
+
+    n_jobs : int or None, default=None
+        Number of chunks hashed in parallel. If None, use the number of CPUs.
+
+    Returns
+    -------
+    chunk_hashes : list of str
+        Hex digest of every chunk, in file order.
+    """
+
+    def hash_chunk(chunk_index: int, n_chunks: int, f_in: t.BinaryIO) -> str:
+        # pylint: disable='unused-argument'
+        return str(_update_from_file(hashlib.sha256(), f_in, chunk_size).hexdigest())
+
+    return _hash_file_chunks(resource_uri, chunk_size, hash_chunk, n_jobs=n_jobs)
+
+
+def _get_blake2b_tree_params(chunk_size: int) -> t.Dict[str, t.Any]:
+    return {"digest_size": 32, "fanout": 0, "depth": 2, "leaf_size": chunk_size, "inner_size": 32}
+
+
+def compute_blake2b_tree(
+    resource_uri: str, chunk_size: int = 64 * 1024 * 1024, n_jobs: t.Optional[int] = None
+) -> str:
+    """Compute the BLAKE2b tree hash of a file, hashing its leaves in parallel.
+
+    Uses BLAKE2b tree mode with unlimited fanout and depth 2: every `chunk_size` chunk of the
+    file is a leaf, and the root node hashes the concatenation of every leaf digest.
+
+    Parameters
+    ----------
+    resource_uri : str
+        File URI to compute hash from.
+
+    chunk_size : int, default=64 MiB
+        Leaf size, in bytes. Must be lower than 4 GiB.
+
+    n_jobs : int or None, default=None
+        Number of leaves hashed in parallel. If None, use the number of CPUs.
+
+    Returns
+    -------
+    tree_hash : str
+        Hex digest of the root node.
+    """
+    tree_params = _get_blake2b_tree_params(chunk_size)
+
+    def hash_chunk(chunk_index: int, n_chunks: int, f_in: t.BinaryIO) -> str:
+        hasher = hashlib.blake2b(
+            **tree_params,
+            node_offset=chunk_index,
+            node_depth=0,
+            last_node=chunk_index == n_chunks - 1,
+        )
+        return str(_update_from_file(hasher, f_in, chunk_size).hexdigest())
+
+    leaf_hashes = _hash_file_chunks(resource_uri, chunk_size, hash_chunk, n_jobs=n_jobs)
+
+    root_hasher = hashlib.blake2b(**tree_params, node_offset=0, node_depth=1, last_node=True)
+
+    for leaf_hash in leaf_hashes:
+        root_hasher.update(bytes.fromhex(leaf_hash))
+
+    return str(root_hasher.hexdigest())
+
+
+def compute_resource_digests(
+    resource_uri: str, chunk_size: int = 64 * 1024 * 1024, n_jobs: t.Optional[int] = None
+) -> t.Dict[str, t.Any]:
+    """Compute every supported digest of a file, in the registry entry format.
+
+    Parameters
+    ----------
+    resource_uri : str
+        File URI to compute digests from.
+
+    chunk_size : int, default=64 MiB
+        Chunk size of alternative digests, in bytes.
+
+    n_jobs : int or None, default=None
+        Number of chunks hashed in parallel. If None, use the number of CPUs.
+
+    Returns
+    -------
+    digests : dict
+        ``sha256``, ``sha256_chunks`` and ``blake2b_tree`` registry entries.
+    """
+    return {
+        "sha256": compute_resource_hash(resource_uri),
+        "sha256_chunks": {
+            "chunk_size": chunk_size,
+            "digests": compute_sha256_chunks(resource_uri, chunk_size=chunk_size, n_jobs=n_jobs),
+        },
+        "blake2b_tree": {
+            "chunk_size": chunk_size,
+            "digest": compute_blake2b_tree(resource_uri, chunk_size=chunk_size, n_jobs=n_jobs),
+        },
+    }
+
+
+def verify_resource(
+    resource_uri: str,
+    resource_config: t.Mapping[str, t.Any],
+    hash_engine: str = "auto",
+    n_jobs: t.Optional[int] = None,
+) -> bool:
+    """Check whether a file matches its registered digest, using the selected hash engine.
+
+    SHA256 (``sha256`` entry) remains the trust anchor of every resource: alternative digests
+    (``sha256_chunks`` and ``blake2b_tree`` entries) are only accelerators, declared in the
+    same registry, verified in parallel across CPU cores.
+
+    Parameters
+    ----------
+    resource_uri : str
+        File URI to verify.
+
+    resource_config : dict
+        Resource registry entry. Must have a ``sha256`` entry.
+
+    hash_engine : {'auto', 'sha256', 'sha256_chunks', 'blake2b_tree'}, default='auto'
+        Hash engine. If ``auto``, use the first alternative digest available (in the order
+        above, since SHA256 is hardware accelerated in most CPUs), falling back to ``sha256``.
+        Selecting an alternative digest not declared for the resource also falls back to
+        ``sha256``.
+
+    n_jobs : int or None, default=None
+        Number of chunks hashed in parallel. If None, use the number of CPUs.
+
+    Returns
+    -------
+    hash_does_match : bool
+        True if `resource_uri` matches its registered digest.
+    """
+    if hash_engine not in HASH_ENGINES:
+        raise ValueError(
+            f"Unknown hash engine '{hash_engine}'. Please provide one of the following: "
+            f"{', '.join(HASH_ENGINES)}."
+        )
+
+    if hash_engine == "auto":
+        hash_engine = next(
+            (engine for engine in ALTERNATIVE_DIGESTS if engine in resource_config), "sha256"
+        )
+
+    if hash_engine == "blake2b_tree" and "blake2b_tree" in resource_config:
+        tree_config = resource_config["blake2b_tree"]
+        tree_hash = compute_blake2b_tree(
+            resource_uri, chunk_size=int(tree_config["chunk_size"]), n_jobs=n_jobs
+        )
+        return bool(tree_hash == tree_config["digest"])
+
+    if hash_engine == "sha256_chunks" and "sha256_chunks" in resource_config:
+        chunks_config = resource_config["sha256_chunks"]
+        chunk_hashes = compute_sha256_chunks(
+            resource_uri, chunk_size=int(chunks_config["chunk_size"]), n_jobs=n_jobs
+        )
+        return bool(chunk_hashes == list(chunks_config["digests"]))
+
+    return check_resource_hash(resource_uri, resource_hash=resource_config["sha256"])
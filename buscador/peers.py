@@ -0,0 +1,248 @@
+"""Share verified local caches with other nodes of a local network over HTTP."""
+import typing as t
+import os
+import re
+import shutil
+import threading
+import warnings
+import http.server
+import urllib.parse
+
+from . import integrity
+from . import chunk_store
+
+
+RE_CHUNK_PATH = re.compile(r"^/chunks/([0-9a-f]{2})/([0-9a-f]{64})$")
+
+
+def get_peer_resource_url(peer_url: str, task_name: str, resource_name: str) -> str:
+    """Build the URL to fetch a resource from a peer started with ``python -m buscador serve``."""
+    task_name = urllib.parse.quote(task_name, safe="")
+    resource_name = urllib.parse.quote(resource_name, safe="")
+    return f"{peer_url.strip().rstrip('/')}/resources/{task_name}/{resource_name}"
+
+
+def get_peer_chunk_url(peer_url: str) -> str:
+    """Build the base URL to fetch chunks from a peer started with ``python -m buscador serve``."""
+    return f"{peer_url.strip().rstrip('/')}/chunks"
+
+
+class CacheServer(http.server.ThreadingHTTPServer):
+    """HTTP server sharing a local resource cache with other nodes.
+
+    Resources are served from ``/resources/<task_name>/<resource_name>`` only if the file
+    ``<cache_dir>/<resource_name><file_extension>`` matches its registered SHA256, hence
+    compressed resources are only shared if they were kept (``clean_compressed_files=False``).
+    Chunks are served from ``/chunks/<sha256[:2]>/<sha256>`` if `chunk_store_dir` is provided.
+
+    Clients still verify every retrieved file, so a peer is never a trust anchor.
+
+    Parameters
+    ----------
+    server_address : tuple of (str, int)
+        Host and port to listen to. Use port 0 to pick any free port.
+
+    cache_dir : str
+        Directory with downloaded resources (the ``output_dir`` of ``download_resource``).
+
+    resource_configs : dict
+        Registered resources, indexed by task name and resource name (e.g.,
+        ``buscador.DEFAULT_URIS``).
+
+    chunk_store_dir : str or None, default=None
+        Chunk store directory to share, if any.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: t.Tuple[str, int],
+        cache_dir: str,
+        resource_configs: t.Mapping[str, t.Mapping[str, t.Any]],
+        chunk_store_dir: t.Optional[str] = None,
+    ):
+        super().__init__(server_address, _CacheRequestHandler)
+        self.resource_configs = resource_configs
+        self.cache_dir = os.path.realpath(os.path.expandvars(os.path.expanduser(cache_dir)))
+        self.chunk_store = chunk_store.ChunkStore(chunk_store_dir) if chunk_store_dir else None
+        self._verified_files: t.Dict[str, t.Tuple[int, int]] = {}
+        self._verified_files_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL of this server, to be provided as a peer URL to other nodes."""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def _get_resource_uri(self, resource_name: str, resource_config: t.Mapping[str, t.Any]) -> str:
+        return os.path.join(self.cache_dir, f"{resource_name}{resource_config['file_extension']}")
+
+    def get_servable_resources(self) -> t.List[t.Tuple[str, str]]:
+        """Get (`task_name`, `resource_name`) pairs whose files are found in the cache directory.
+
+        Files are only verified (hashed) when requested, so this is a cheap existence check.
+        """
+        return [
+            (task_name, resource_name)
+            for task_name, task_resources in self.resource_configs.items()
+            for resource_name, resource_config in task_resources.items()
+            if os.path.isfile(self._get_resource_uri(resource_name, resource_config))
+        ]
+
+    def get_resource_path(self, task_name: str, resource_name: str) -> t.Optional[str]:
+        """Get the path of a verified cached resource, or None if it is not available."""
+        try:
+            resource_config = self.resource_configs[task_name][resource_name]
+
+        except KeyError:
+            return None
+
+        resource_uri = self._get_resource_uri(resource_name, resource_config)
+
+        try:
+            resource_stat = os.stat(resource_uri)
+
+        except OSError:
+            return None
+
+        stat_key = (resource_stat.st_size, resource_stat.st_mtime_ns)
+
+        with self._verified_files_lock:
+            if self._verified_files.get(resource_uri) == stat_key:
+                return resource_uri
+
+        if not integrity.check_resource_hash(resource_uri, resource_config["sha256"]):
+            return None
+
+        with self._verified_files_lock:
+            self._verified_files[resource_uri] = stat_key
+
+        return resource_uri
+
+    def get_chunk_path(self, path: str) -> t.Optional[str]:
+        """Get the path of a stored chunk from its request path, or None if not available."""
+        match = RE_CHUNK_PATH.match(path)
+
+        if self.chunk_store is None or not match or match.group(2)[:2] != match.group(1):
+            return None
+
+        chunk_sha256 = match.group(2)
+
+        if not self.chunk_store.has_chunk(chunk_sha256):
+            return None
+
+        return self.chunk_store.chunk_path(chunk_sha256)
+
+
+class _CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serve verified resources and chunks from a ``CacheServer``."""
+
+    server: CacheServer
+
+    def do_GET(self) -> None:  # pylint: disable='invalid-name'
+        """Send a cached file."""
+        self._send_file(include_body=True)
+
+    def do_HEAD(self) -> None:  # pylint: disable='invalid-name'
+        """Send headers of a cached file."""
+        self._send_file(include_body=False)
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        # pylint: disable='redefined-builtin'
+        """Do not log every request."""
+
+    def _resolve_path(self) -> t.Optional[str]:
+        path = urllib.parse.urlsplit(self.path).path
+
+        if path.startswith("/chunks/"):
+            return self.server.get_chunk_path(path)
+
+        path_parts = path.split("/")
+
+        if len(path_parts) != 4 or path_parts[1] != "resources":
+            return None
+
+        task_name, resource_name = map(urllib.parse.unquote, path_parts[2:])
+        return self.server.get_resource_path(task_name, resource_name)
+
+    def _send_file(self, include_body: bool) -> None:
+        file_uri = self._resolve_path()
+
+        if file_uri is None:
+            self.send_error(404)
+            return
+
+        try:
+            f_in = open(file_uri, "rb")  # pylint: disable='consider-using-with'
+
+        except OSError:
+            self.send_error(404)
+            return
+
+        with f_in:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f_in.fileno()).st_size))
+            self.end_headers()
+
+            if include_body:
+                shutil.copyfileobj(f_in, self.wfile, 1024 * 1024)
+
+
+def serve_cache(
+    cache_dir: str,
+    resource_configs: t.Mapping[str, t.Mapping[str, t.Any]],
+    host: str = "0.0.0.0",
+    port: int = 8765,
+    chunk_store_dir: t.Optional[str] = None,
+) -> None:
+    """Share a local resource cache with other nodes until interrupted.
+
+    A warning is issued if no registered resource file is found in `cache_dir`; e.g., if
+    compressed resources were deleted after decompression (``clean_compressed_files=True``).
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory with downloaded resources (the ``output_dir`` of ``download_resource``).
+
+    resource_configs : dict
+        Registered resources, indexed by task name and resource name (e.g.,
+        ``buscador.DEFAULT_URIS``).
+
+    host : str, default="0.0.0.0"
+        Host address to listen to.
+
+    port : int, default=8765
+        Port to listen to.
+
+    chunk_store_dir : str or None, default=None
+        Chunk store directory to share, if any.
+
+    Returns
+    -------
+    None
+    """
+    with CacheServer(
+        (host, port),
+        cache_dir=cache_dir,
+        resource_configs=resource_configs,
+        chunk_store_dir=chunk_store_dir,
+    ) as server:
+        if not server.get_servable_resources():
+            warnings.warn(
+                message=(
+                    f"No registered resource file found in '{server.cache_dir}', hence no "
+                    "resource will be shared. Note that compressed resources are only shared "
+                    "if they were kept after decompression ('--keep-compressed-files' or "
+                    "'clean_compressed_files=False')."
+                ),
+                category=RuntimeWarning,
+            )
+
+        try:
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+            pass
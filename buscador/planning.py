@@ -0,0 +1,264 @@
+"""Plan resource downloads: what is cached, what must be fetched, and what it will cost."""
+import typing as t
+import os
+import shutil
+import urllib.request
+
+from . import download_resources
+from . import user_cache
+from . import decompress
+from . import integrity
+
+
+ResourceIdType = t.Tuple[str, str]
+
+
+class ResourcePlan(t.NamedTuple):
+    """Download plan of a single resource.
+
+    Sizes and estimated time are None when unknown.
+    """
+
+    task_name: str
+    resource_name: str
+    output_uri: str
+    is_cached: bool
+    source_url: t.Optional[str]
+    download_size_in_bytes: t.Optional[int]
+    extracted_size_in_bytes: t.Optional[int]
+    estimated_seconds: t.Optional[float]
+
+    @property
+    def is_compressed(self) -> bool:
+        """True if this resource is decompressed after download."""
+        return os.path.splitext(self.output_uri)[1].lstrip(".") in decompress.COMPRESSION_ALG
+
+    @property
+    def required_disk_space_in_bytes(self) -> t.Optional[int]:
+        """Peak disk space required to fetch and decompress this resource, in bytes."""
+        if self.is_cached:
+            return 0
+
+        if self.download_size_in_bytes is None:
+            return None
+
+        if self.is_compressed and self.extracted_size_in_bytes is None:
+            return None
+
+        return self.download_size_in_bytes + (self.extracted_size_in_bytes or 0)
+
+
+class DownloadPlan(t.NamedTuple):
+    """Download plan of a set of resources.
+
+    Totals are lower bounds if any size is unknown; see `has_unknown_sizes`.
+    """
+
+    output_dir: str
+    resources: t.Tuple[ResourcePlan, ...]
+    free_disk_space_in_bytes: int
+
+    @property
+    def pending_resources(self) -> t.Tuple[ResourcePlan, ...]:
+        """Resources that must be fetched."""
+        return tuple(resource for resource in self.resources if not resource.is_cached)
+
+    @property
+    def download_size_in_bytes(self) -> int:
+        """Total size to download, in bytes."""
+        return sum(resource.download_size_in_bytes or 0 for resource in self.pending_resources)
+
+    @property
+    def required_disk_space_in_bytes(self) -> int:
+        """Upper bound of the disk space required to fetch every pending resource, in bytes.
+
+        If `has_unknown_sizes`, this is a lower bound instead: resources with an unknown
+        extracted size still account for their download size.
+        """
+        required_disk_space = 0
+
+        for resource in self.pending_resources:
+            resource_disk_space = resource.required_disk_space_in_bytes
+
+            if resource_disk_space is None:
+                resource_disk_space = resource.download_size_in_bytes or 0
+
+            required_disk_space += resource_disk_space
+
+        return required_disk_space
+
+    @property
+    def estimated_seconds(self) -> t.Optional[float]:
+        """Estimated time to fetch every pending resource, or None if any estimate is missing."""
+        estimates = [resource.estimated_seconds for resource in self.pending_resources]
+
+        if any(estimate is None for estimate in estimates):
+            return None
+
+        return float(sum(t.cast(t.List[float], estimates)))
+
+    @property
+    def has_unknown_sizes(self) -> bool:
+        """True if the download or extracted size of any pending resource is unknown."""
+        return any(
+            resource.required_disk_space_in_bytes is None for resource in self.pending_resources
+        )
+
+    @property
+    def fits_in_disk(self) -> t.Optional[bool]:
+        """Whether the required disk space is available.
+
+        None if inconclusive: sizes are unknown, and their known part fits in disk.
+        """
+        if self.required_disk_space_in_bytes > self.free_disk_space_in_bytes:
+            return False
+
+        return None if self.has_unknown_sizes else True
+
+
+def probe_download_size(url: str, timeout_limit_seconds: int = 10) -> t.Optional[int]:
+    """Get the size of a remote file from its ``Content-Length`` header, without downloading it.
+
+    Returns None if the size could not be retrieved.
+    """
+    request = urllib.request.Request(url.strip(), method="HEAD")
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout_limit_seconds) as response:
+            content_length = response.headers.get("Content-Length")
+
+    except (OSError, ValueError):
+        return None
+
+    try:
+        return int(content_length) if content_length is not None else None
+
+    except ValueError:
+        return None
+
+
+def _get_free_disk_space(output_dir: str) -> int:
+    """Get free disk space where `output_dir` is (or would be) created, in bytes."""
+    existing_dir = output_dir
+
+    while not os.path.isdir(existing_dir):
+        parent_dir = os.path.dirname(existing_dir)
+        if parent_dir == existing_dir:
+            break
+        existing_dir = parent_dir
+
+    return int(shutil.disk_usage(existing_dir).free)
+
+
+def plan_download(
+    resources: t.Iterable[ResourceIdType],
+    output_dir: str = ".",
+    check_cached: bool = True,
+    probe_urls: bool = False,
+    timeout_limit_seconds: int = 10,
+) -> DownloadPlan:
+    """Plan the download of resources, without downloading (or creating) anything.
+
+    Resolves which resources are already cached in `output_dir`, which must be fetched, their
+    sizes (from their ``size_in_bytes`` and ``extracted_size_in_bytes`` registry entries),
+    the estimated download time (from the historical throughput of each mirror), and the free
+    disk space available.
+
+    Parameters
+    ----------
+    resources : iterable of tuple of (str, str)
+        (`task_name`, `resource_name`) pairs to plan.
+
+    output_dir : str, default="."
+        Directory to save the downloaded resources.
+
+    check_cached : bool, default=True
+        If True, resources found locally are not fetched, as in ``download_resource``.
+
+    probe_urls : bool, default=False
+        If True, retrieve the size of resources without a registered ``size_in_bytes`` from
+        their first URL (``HEAD`` request).
+
+    timeout_limit_seconds : int, default=10
+        Timeout limit for URL probes, in seconds.
+
+    Returns
+    -------
+    plan : DownloadPlan
+        Download plan. Check ``plan.fits_in_disk`` (None if inconclusive) before downloading.
+    """
+    output_dir = os.path.realpath(os.path.expandvars(os.path.expanduser(output_dir.strip())))
+    resource_plans: t.List[ResourcePlan] = []
+
+    for task_name, resource_name in resources:
+        try:
+            resource_config = download_resources.DEFAULT_URIS[task_name][resource_name]
+
+        except KeyError as k_err:
+            raise ValueError(
+                f"Unknown resource '{resource_name}' for task '{task_name}'."
+            ) from k_err
+
+        f_extension = resource_config["file_extension"]
+        output_uri = os.path.join(output_dir, f"{resource_name}{f_extension}")
+        is_cached = check_cached and download_resources.is_cached(output_uri)
+        source_url = None if is_cached else next(iter(resource_config["urls"]), None)
+        download_size = resource_config.get("size_in_bytes")
+
+        if source_url is not None and download_size is None and probe_urls:
+            download_size = probe_download_size(source_url, timeout_limit_seconds)
+
+        estimated_seconds = None
+
+        if source_url is not None and download_size is not None:
+            throughput = user_cache.get_download_throughput(source_url.strip())
+            estimated_seconds = download_size / throughput if throughput else None
+
+        resource_plans.append(
+            ResourcePlan(
+                task_name=task_name,
+                resource_name=resource_name,
+                output_uri=output_uri,
+                is_cached=is_cached,
+                source_url=source_url,
+                download_size_in_bytes=download_size,
+                extracted_size_in_bytes=resource_config.get("extracted_size_in_bytes"),
+                estimated_seconds=estimated_seconds,
+            )
+        )
+
+    return DownloadPlan(
+        output_dir=output_dir,
+        resources=tuple(resource_plans),
+        free_disk_space_in_bytes=_get_free_disk_space(output_dir),
+    )
+
+
+def describe_resource_file(file_uri: str) -> t.Dict[str, t.Any]:
+    """Build the registry entry of a resource file, to be completed with its download URLs.
+
+    Parameters
+    ----------
+    file_uri : str
+        Resource file, as it will be downloaded (e.g., ``my_resource.zip``).
+
+    Returns
+    -------
+    resource_config : dict
+        Registry entry with ``sha256``, ``file_extension``, ``urls`` (empty) and
+        ``size_in_bytes``, plus ``extracted_size_in_bytes`` for compressed files.
+    """
+    file_uri = os.path.realpath(os.path.expandvars(os.path.expanduser(file_uri.strip())))
+    resource_config: t.Dict[str, t.Any] = {
+        "sha256": integrity.compute_resource_hash(file_uri),
+        "file_extension": os.path.splitext(file_uri)[1],
+        "urls": [],
+        "size_in_bytes": os.path.getsize(file_uri),
+    }
+
+    extracted_size = decompress.get_uncompressed_size(file_uri)
+
+    if extracted_size is not None:
+        resource_config["extracted_size_in_bytes"] = extracted_size
+
+    return resource_config
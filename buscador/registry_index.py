@@ -0,0 +1,290 @@
+"""Compiled index of registered resources, for fast lookup, search and reverse lookup by hash."""
+import typing as t
+import sys
+import bisect
+import difflib
+
+from . import integrity
+
+
+ResourceConfigsType = t.Mapping[str, t.Mapping[str, t.Mapping[str, t.Any]]]
+
+
+class ResourceEntry(t.NamedTuple):
+    """Registry entry of a single resource."""
+
+    task_name: str
+    resource_name: str
+    sha256: str
+    file_extension: str
+    urls: t.Tuple[str, ...]
+    size_in_bytes: t.Optional[int] = None
+    extracted_size_in_bytes: t.Optional[int] = None
+
+
+class RegistryIndex:
+    """Compiled index of registered resources.
+
+    Resource names are interned and kept sorted, enabling prefix search by bisection, and
+    every entry is also indexed by its SHA256, to identify resource files quickly.
+
+    Parameters
+    ----------
+    entries : iterable of ResourceEntry
+        Registered resources.
+
+    task_names : iterable of str or None, default=None
+        Every registered task, including tasks without resources. If None, use the tasks of
+        `entries`, in order.
+
+    See Also
+    --------
+    load_registry_index : compile the index of registry entries, once per process.
+    """
+
+    def __init__(
+        self,
+        entries: t.Iterable[ResourceEntry],
+        task_names: t.Optional[t.Iterable[str]] = None,
+    ):
+        entries = tuple(entries)
+        resource_names_by_task: t.Dict[str, t.List[str]] = {
+            task_name: [] for task_name in (task_names or ())
+        }
+
+        for entry in entries:
+            resource_names_by_task.setdefault(entry.task_name, []).append(entry.resource_name)
+
+        self.task_names: t.Tuple[str, ...] = tuple(resource_names_by_task)
+        self._resource_names_by_task: t.Dict[str, t.Tuple[str, ...]] = {
+            task_name: tuple(resource_names)
+            for task_name, resource_names in resource_names_by_task.items()
+        }
+        self.entries: t.Tuple[ResourceEntry, ...] = tuple(
+            sorted(entries, key=lambda entry: (entry.resource_name, entry.task_name))
+        )
+        self._sorted_names: t.List[str] = [entry.resource_name for entry in self.entries]
+        self._by_id: t.Dict[t.Tuple[str, str], ResourceEntry] = {
+            (entry.task_name, entry.resource_name): entry for entry in self.entries
+        }
+        self._by_sha256: t.Dict[str, ResourceEntry] = {
+            entry.sha256: entry for entry in self.entries
+        }
+        self._unique_names: t.List[str] = sorted(set(self._sorted_names))
+
+    @classmethod
+    def from_resource_configs(cls, resource_configs: ResourceConfigsType) -> "RegistryIndex":
+        """Compile an index from registry entries indexed by task and resource names."""
+        entries = []
+
+        for task_name, task_resources in resource_configs.items():
+            task_name = sys.intern(task_name)
+
+            for resource_name, resource_config in task_resources.items():
+                entries.append(
+                    ResourceEntry(
+                        task_name=task_name,
+                        resource_name=sys.intern(resource_name),
+                        sha256=resource_config["sha256"],
+                        file_extension=sys.intern(resource_config["file_extension"]),
+                        urls=tuple(resource_config["urls"]),
+                        size_in_bytes=resource_config.get("size_in_bytes"),
+                        extracted_size_in_bytes=resource_config.get("extracted_size_in_bytes"),
+                    )
+                )
+
+        return cls(entries, task_names=[sys.intern(task_name) for task_name in resource_configs])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> t.Iterator[ResourceEntry]:
+        return iter(self.entries)
+
+    def get_task_resource_names(self, task_name: str) -> t.Optional[t.Tuple[str, ...]]:
+        """Get the names of every resource of a task, in registry order, or None if unknown."""
+        return self._resource_names_by_task.get(task_name)
+
+    def get(self, task_name: str, resource_name: str) -> t.Optional[ResourceEntry]:
+        """Get a resource entry, or None if it is not registered."""
+        return self._by_id.get((task_name, resource_name))
+
+    def find_by_sha256(self, sha256: str) -> t.Optional[ResourceEntry]:
+        """Get the resource entry with the provided SHA256, or None if not registered."""
+        return self._by_sha256.get(sha256.strip().lower())
+
+    def identify_file(self, file_uri: str) -> t.Optional[ResourceEntry]:
+        """Get the resource entry matching the SHA256 of a file, or None if not registered."""
+        return self.find_by_sha256(integrity.compute_resource_hash(file_uri))
+
+    def find_by_name(self, resource_name: str) -> t.List[ResourceEntry]:
+        """Get every resource entry named `resource_name`, from any task."""
+        start = bisect.bisect_left(self._sorted_names, resource_name)
+        end = bisect.bisect_right(self._sorted_names, resource_name)
+        return list(self.entries[start:end])
+
+    def find_by_prefix(self, prefix: str) -> t.List[ResourceEntry]:
+        """Get every resource entry whose resource name starts with `prefix`."""
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = start
+
+        while end < len(self.entries) and self._sorted_names[end].startswith(prefix):
+            end += 1
+
+        return list(self.entries[start:end])
+
+    def filter(
+        self,
+        task_name: t.Optional[str] = None,
+        file_extension: t.Optional[str] = None,
+        min_size_in_bytes: t.Optional[int] = None,
+        max_size_in_bytes: t.Optional[int] = None,
+        entries: t.Optional[t.Iterable[ResourceEntry]] = None,
+    ) -> t.List[ResourceEntry]:
+        """Get resource entries matching every provided criterion.
+
+        Entries with unknown size never match if a size criterion is provided.
+
+        Parameters
+        ----------
+        task_name : str or None, default=None
+            Keep only resources from this task.
+
+        file_extension : str or None, default=None
+            Keep only resources with this file extension (e.g., ``.zip``).
+
+        min_size_in_bytes : int or None, default=None
+            Keep only resources with at least this size, in bytes.
+
+        max_size_in_bytes : int or None, default=None
+            Keep only resources with at most this size, in bytes.
+
+        entries : iterable of ResourceEntry or None, default=None
+            Entries to filter. If None, filter every entry from this index.
+
+        Returns
+        -------
+        entries : list of ResourceEntry
+            Matching entries.
+        """
+        if file_extension is not None and not file_extension.startswith("."):
+            file_extension = f".{file_extension}"
+
+        def is_match(entry: ResourceEntry) -> bool:
+            if task_name is not None and entry.task_name != task_name:
+                return False
+
+            if file_extension is not None and entry.file_extension != file_extension:
+                return False
+
+            if min_size_in_bytes is None and max_size_in_bytes is None:
+                return True
+
+            size = entry.size_in_bytes
+
+            return (
+                size is not None
+                and (min_size_in_bytes is None or size >= min_size_in_bytes)
+                and (max_size_in_bytes is None or size <= max_size_in_bytes)
+            )
+
+        if entries is None:
+            entries = self.entries
+
+        return [entry for entry in entries if is_match(entry)]
+
+    def search(
+        self,
+        query: str,
+        fuzzy_cutoff: float = 0.6,
+        limit: t.Optional[int] = None,
+        **kwargs: t.Any,
+    ) -> t.List[ResourceEntry]:
+        """Search resources by name.
+
+        Prefix matches come first, followed by substring matches and, finally, by similar
+        (fuzzy) matches, ordered by decreasing similarity.
+
+        Parameters
+        ----------
+        query : str
+            Resource name (or part of it) to search for.
+
+        fuzzy_cutoff : float, default=0.6
+            Minimum similarity, in [0, 1], of fuzzy matches. See ``difflib.get_close_matches``.
+
+        limit : int or None, default=None
+            Maximum number of entries to return. If None, return every match.
+
+        **kwargs : dict
+            Extra filter criteria. See ``RegistryIndex.filter``.
+
+        Returns
+        -------
+        entries : list of ResourceEntry
+            Matching entries.
+        """
+        query = query.strip()
+        matched_names: t.Dict[str, None] = dict.fromkeys(
+            entry.resource_name for entry in self.find_by_prefix(query)
+        )
+        matched_names.update(dict.fromkeys(name for name in self._unique_names if query in name))
+        matched_names.update(
+            dict.fromkeys(
+                difflib.get_close_matches(
+                    query, self._unique_names, n=len(self._unique_names), cutoff=fuzzy_cutoff
+                )
+            )
+        )
+
+        entries = [entry for name in matched_names for entry in self.find_by_name(name)]
+
+        return self.filter(entries=entries, **kwargs)[:limit]
+
+
+_LOADED_INDEX: t.Dict[str, t.Any] = {}
+
+
+def load_registry_index(
+    resource_configs: ResourceConfigsType, use_cache: bool = True
+) -> RegistryIndex:
+    """Compile the index of registry entries indexed by task and resource names.
+
+    The compiled index is kept for the rest of the process, and only compiled again if tasks
+    of `resource_configs` are added, removed or replaced, or their number of resources changes.
+
+    Parameters
+    ----------
+    resource_configs : dict
+        Registry entries, indexed by task and resource names (e.g., ``buscador.DEFAULT_URIS``).
+
+    use_cache : bool, default=True
+        If False, compile the index again, ignoring and not updating the compiled index.
+
+    Returns
+    -------
+    registry_index : RegistryIndex
+        Compiled registry index.
+
+    See Also
+    --------
+    buscador.get_registry_index : get the index of every registered resource.
+    """
+    if not use_cache:
+        return RegistryIndex.from_resource_configs(resource_configs)
+
+    # Note: tasks are compared by identity (and size), which is cheaper than compiling again.
+    # The compared tasks are kept referenced, hence their identities are never reused.
+    index_key = tuple(
+        (task_name, id(task_resources), len(task_resources))
+        for task_name, task_resources in resource_configs.items()
+    )
+
+    if _LOADED_INDEX.get("key") != index_key:
+        _LOADED_INDEX.update(
+            key=index_key,
+            task_resources=tuple(resource_configs.values()),
+            registry_index=RegistryIndex.from_resource_configs(resource_configs),
+        )
+
+    return t.cast(RegistryIndex, _LOADED_INDEX["registry_index"])
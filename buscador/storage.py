@@ -0,0 +1,395 @@
+"""Storage backends to fetch resources from local file systems and S3-compatible object stores."""
+import typing as t
+import os
+import abc
+import hmac
+import shutil
+import hashlib
+import datetime
+import threading
+import urllib.parse
+import urllib.request
+import concurrent.futures
+
+import tqdm
+
+
+EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+class StorageBackend(abc.ABC):
+    """Source of resource files, addressed by URL.
+
+    Backends only need to implement ``get_size`` and ``open_range``: ``fetch`` then downloads
+    files in parts, in parallel, streaming each part to its position in the output file.
+
+    Parameters
+    ----------
+    n_jobs : int, default=8
+        Number of parts to fetch in parallel.
+
+    part_size_in_bytes : int, default=8 MiB
+        Size of each part, in bytes.
+    """
+
+    def __init__(self, n_jobs: int = 8, part_size_in_bytes: int = 8 * 1024 * 1024):
+        self.n_jobs = int(n_jobs)
+        self.part_size_in_bytes = int(part_size_in_bytes)
+
+    @abc.abstractmethod
+    def get_size(self, url: str, timeout_limit_seconds: int = 10) -> int:
+        """Get the size of a file, in bytes."""
+
+    @abc.abstractmethod
+    def open_range(
+        self, url: str, start: int, end: int, timeout_limit_seconds: int = 10
+    ) -> t.BinaryIO:
+        """Open a stream of bytes ``[start, end)`` of a file."""
+
+    def fetch(
+        self,
+        url: str,
+        output_uri: str,
+        show_progress_bar: bool = True,
+        timeout_limit_seconds: int = 10,
+    ) -> None:
+        """Fetch a file into `output_uri`, fetching its parts in parallel.
+
+        Parameters
+        ----------
+        url : str
+            URL to fetch file from.
+
+        output_uri : str
+            Output URI (full path, ending with the filename and its extension) to save file.
+
+        show_progress_bar: bool, default=True
+            If True, show download progress bar.
+
+        timeout_limit_seconds : int, default=10
+            Timeout limit for stale connections, in seconds.
+
+        Returns
+        -------
+        None
+        """
+        file_size = self.get_size(url, timeout_limit_seconds=timeout_limit_seconds)
+        part_starts = range(0, file_size, self.part_size_in_bytes)
+        pbar = None
+        pbar_lock = threading.Lock()
+
+        if show_progress_bar:
+            pbar = tqdm.tqdm(
+                total=file_size,
+                unit_scale=True,
+                unit_divisor=1024,
+                unit="B",
+                desc=f"Downloading {os.path.basename(output_uri)}",
+            )
+
+        def fetch_part(start: int) -> None:
+            end = min(start + self.part_size_in_bytes, file_size)
+
+            with self.open_range(url, start, end, timeout_limit_seconds) as f_in, open(
+                output_uri, "r+b"
+            ) as f_out:
+                f_out.seek(start)
+
+                for data_chunk in iter(lambda: f_in.read(1024 * 1024), b""):
+                    f_out.write(data_chunk)
+
+                    if pbar is not None:
+                        with pbar_lock:
+                            pbar.update(len(data_chunk))
+
+                if f_out.tell() != end:
+                    raise ConnectionError(f"Incomplete part [{start}, {end}) from '{url}'.")
+
+        try:
+            with open(output_uri, "wb") as f_out:
+                f_out.truncate(file_size)
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+                for _ in executor.map(fetch_part, part_starts):
+                    pass
+
+        finally:
+            if pbar is not None:
+                pbar.close()
+
+
+class LocalFileSystemBackend(StorageBackend):
+    """Fetch files from the local file system (e.g., mirrors mounted through NFS), as ``file://``.
+
+    Whole files are copied with ``shutil.copyfile``, which uses in-kernel copies if available.
+    """
+
+    @staticmethod
+    def get_path(url: str) -> str:
+        """Get the local path of a ``file://`` URL."""
+        return urllib.request.url2pathname(urllib.parse.urlsplit(url).path)
+
+    def get_size(self, url: str, timeout_limit_seconds: int = 10) -> int:
+        return os.path.getsize(self.get_path(url))
+
+    def open_range(
+        self, url: str, start: int, end: int, timeout_limit_seconds: int = 10
+    ) -> t.BinaryIO:
+        f_in = open(self.get_path(url), "rb")  # pylint: disable='consider-using-with'
+        f_in.seek(start)
+        return t.cast(t.BinaryIO, _LimitedReader(f_in, end - start))
+
+    def fetch(
+        self,
+        url: str,
+        output_uri: str,
+        show_progress_bar: bool = True,
+        timeout_limit_seconds: int = 10,
+    ) -> None:
+        shutil.copyfile(self.get_path(url), output_uri)
+
+
+class _LimitedReader:
+    """Read at most `size` bytes from a file object, closing it on exit."""
+
+    def __init__(self, f_in: t.BinaryIO, size: int):
+        self.f_in = f_in
+        self.remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes (or every remaining byte, if `size` is negative)."""
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.f_in.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        """Close the underlying file object."""
+        self.f_in.close()
+
+    def __enter__(self) -> "_LimitedReader":
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        self.close()
+
+
+def sign_request_v4(
+    method: str,
+    url: str,
+    headers: t.Dict[str, str],
+    access_key_id: str,
+    secret_access_key: str,
+    region: str,
+    service: str = "s3",
+    session_token: t.Optional[str] = None,
+    amz_date: t.Optional[str] = None,
+) -> t.Dict[str, str]:
+    """Sign a bodiless request with AWS Signature Version 4.
+
+    Parameters
+    ----------
+    method : str
+        HTTP method (e.g., ``GET``).
+
+    url : str
+        Request URL, with an already URI-encoded path.
+
+    headers : dict of str to str
+        Request headers to sign, alongside the ``host`` and ``x-amz-*`` headers.
+
+    access_key_id : str
+        Access key ID.
+
+    secret_access_key : str
+        Secret access key.
+
+    region : str
+        Region name (e.g., ``us-east-1``).
+
+    service : str, default="s3"
+        Service name.
+
+    session_token : str or None, default=None
+        Session token, for temporary credentials.
+
+    amz_date : str or None, default=None
+        Request time in ``%Y%m%dT%H%M%SZ`` format. If None, use the current time.
+
+    Returns
+    -------
+    signed_headers : dict of str to str
+        Request headers, including the ``Authorization`` header.
+    """
+    split_url = urllib.parse.urlsplit(url)
+    amz_date = amz_date or datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = amz_date[:8]
+
+    signed_headers = {key.lower(): value.strip() for key, value in headers.items()}
+    signed_headers["host"] = split_url.netloc
+    signed_headers["x-amz-date"] = amz_date
+    signed_headers.setdefault("x-amz-content-sha256", EMPTY_PAYLOAD_SHA256)
+
+    if session_token:
+        signed_headers["x-amz-security-token"] = session_token
+
+    header_names = sorted(signed_headers)
+    canonical_query = "&".join(
+        sorted(
+            f"{urllib.parse.quote(key, safe='-_.~')}={urllib.parse.quote(value, safe='-_.~')}"
+            for key, value in urllib.parse.parse_qsl(split_url.query, keep_blank_values=True)
+        )
+    )
+    canonical_request = "\n".join(
+        [
+            method,
+            split_url.path or "/",
+            canonical_query,
+            "".join(f"{name}:{signed_headers[name]}\n" for name in header_names),
+            ";".join(header_names),
+            signed_headers["x-amz-content-sha256"],
+        ]
+    )
+
+    credential_scope = f"{date_stamp}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join(
+        [
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            credential_scope,
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ]
+    )
+
+    signing_key = f"AWS4{secret_access_key}".encode("utf-8")
+
+    for scope_part in (date_stamp, region, service, "aws4_request"):
+        signing_key = hmac.new(signing_key, scope_part.encode("utf-8"), hashlib.sha256).digest()
+
+    signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    signed_headers["authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key_id}/{credential_scope}, "
+        f"SignedHeaders={';'.join(header_names)}, Signature={signature}"
+    )
+
+    signed_headers.pop("host")
+
+    return signed_headers
+
+
+class S3Backend(StorageBackend):
+    """Fetch files from S3-compatible object stores, as ``s3://<bucket>/<key>``.
+
+    Objects are addressed in path style (``<endpoint_url>/<bucket>/<key>``), which is supported
+    by most S3-compatible stores. Requests are signed (AWS Signature Version 4) if credentials
+    are available, and anonymous otherwise.
+
+    Parameters
+    ----------
+    endpoint_url : str or None, default=None
+        Object store endpoint. If None, use the ``BUSCADOR_S3_ENDPOINT_URL`` environment
+        variable, or ``https://s3.amazonaws.com``.
+
+    region : str or None, default=None
+        Region name. If None, use ``AWS_REGION`` or ``AWS_DEFAULT_REGION`` environment
+        variables, or ``us-east-1``.
+
+    access_key_id : str or None, default=None
+        Access key ID. If None, use the ``AWS_ACCESS_KEY_ID`` environment variable.
+
+    secret_access_key : str or None, default=None
+        Secret access key. If None, use the ``AWS_SECRET_ACCESS_KEY`` environment variable.
+
+    session_token : str or None, default=None
+        Session token. If None, use the ``AWS_SESSION_TOKEN`` environment variable.
+
+    n_jobs : int, default=8
+        Number of parts to fetch in parallel.
+
+    part_size_in_bytes : int, default=8 MiB
+        Size of each part, in bytes.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: t.Optional[str] = None,
+        region: t.Optional[str] = None,
+        access_key_id: t.Optional[str] = None,
+        secret_access_key: t.Optional[str] = None,
+        session_token: t.Optional[str] = None,
+        n_jobs: int = 8,
+        part_size_in_bytes: int = 8 * 1024 * 1024,
+    ):
+        super().__init__(n_jobs=n_jobs, part_size_in_bytes=part_size_in_bytes)
+        self.endpoint_url = (
+            endpoint_url or os.environ.get("BUSCADOR_S3_ENDPOINT_URL") or "https://s3.amazonaws.com"
+        ).rstrip("/")
+        self.region = (
+            region or os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+        ) or "us-east-1"
+        self.access_key_id = access_key_id or os.environ.get("AWS_ACCESS_KEY_ID")
+        self.secret_access_key = secret_access_key or os.environ.get("AWS_SECRET_ACCESS_KEY")
+        self.session_token = session_token or os.environ.get("AWS_SESSION_TOKEN")
+
+    def get_object_url(self, url: str) -> str:
+        """Get the HTTP(S) URL of a ``s3://<bucket>/<key>`` URL."""
+        split_url = urllib.parse.urlsplit(url)
+        object_path = urllib.parse.quote(f"/{split_url.netloc}{split_url.path}", safe="/-_.~")
+        return f"{self.endpoint_url}{object_path}"
+
+    def _open(
+        self,
+        method: str,
+        url: str,
+        headers: t.Dict[str, str],
+        timeout_limit_seconds: int,
+    ) -> t.Any:
+        object_url = self.get_object_url(url)
+
+        if self.access_key_id and self.secret_access_key:
+            headers = sign_request_v4(
+                method=method,
+                url=object_url,
+                headers=headers,
+                access_key_id=self.access_key_id,
+                secret_access_key=self.secret_access_key,
+                region=self.region,
+                session_token=self.session_token,
+            )
+
+        request = urllib.request.Request(object_url, headers=headers, method=method)
+        return urllib.request.urlopen(request, timeout=timeout_limit_seconds)
+
+    def get_size(self, url: str, timeout_limit_seconds: int = 10) -> int:
+        with self._open("HEAD", url, {}, timeout_limit_seconds) as response:
+            return int(response.headers["Content-Length"])
+
+    def open_range(
+        self, url: str, start: int, end: int, timeout_limit_seconds: int = 10
+    ) -> t.BinaryIO:
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        response = self._open("GET", url, headers, timeout_limit_seconds)
+
+        if response.status != 206 and (start, end) != (0, int(response.headers["Content-Length"])):
+            response.close()
+            raise ConnectionError(f"Object store does not support range requests ('{url}').")
+
+        return t.cast(t.BinaryIO, response)
+
+
+BACKENDS: t.Dict[str, t.Callable[[], StorageBackend]] = {
+    "file": LocalFileSystemBackend,
+    "s3": S3Backend,
+}
+
+
+def get_backend(url: str) -> t.Optional[StorageBackend]:
+    """Get the storage backend for the scheme of `url`, or None if no backend is registered."""
+    backend_factory = BACKENDS.get(urllib.parse.urlsplit(url.strip()).scheme.lower())
+    return backend_factory() if backend_factory is not None else None
+
+
+def get_mirror_resource_url(mirror_url: str, resource_name: str, file_extension: str) -> str:
+    """Build the URL of a resource in a mirror, as ``<mirror_url>/<resource_name><extension>``."""
+    return f"{mirror_url.strip().rstrip('/')}/{resource_name}{file_extension}"
@@ -0,0 +1,163 @@
+"""Locate and maintain the per-user cache of this package (e.g., mirror throughput history)."""
+import typing as t
+import os
+import json
+import tempfile
+import urllib.parse
+
+
+THROUGHPUT_HISTORY_FILENAME = "throughput_history.json"
+THROUGHPUT_HISTORY_OPT_OUT_ENV = "BUSCADOR_DISABLE_THROUGHPUT_HISTORY"
+THROUGHPUT_MIN_SAMPLE_SIZE_IN_BYTES = 1024 * 1024
+THROUGHPUT_SMOOTHING_FACTOR = 0.3
+
+
+def get_default_cache_dir() -> str:
+    """Get the per-user cache directory: ``$XDG_CACHE_HOME/buscador`` or ``~/.cache/buscador``."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(os.path.expanduser(cache_home), "buscador")
+
+
+def get_mirror_name(url: str) -> str:
+    """Get the mirror (host) name of a URL, used to aggregate its throughput history."""
+    return urllib.parse.urlsplit(url.strip()).netloc
+
+
+def _is_valid_mirror_history(mirror_history: t.Any) -> bool:
+    """Check whether a mirror entry of the throughput history is well-formed."""
+    if not isinstance(mirror_history, dict):
+        return False
+
+    bytes_per_second = mirror_history.get("bytes_per_second")
+    samples = mirror_history.get("samples")
+
+    return (
+        isinstance(bytes_per_second, (int, float))
+        and isinstance(samples, int)
+        and bytes_per_second > 0.0
+        and samples > 0
+    )
+
+
+def read_throughput_history(cache_dir: t.Optional[str] = None) -> t.Dict[str, t.Dict[str, float]]:
+    """Read the download throughput history of every mirror, indexed by mirror name.
+
+    Malformed entries are ignored.
+
+    Parameters
+    ----------
+    cache_dir : str or None, default=None
+        Cache directory. If None, use ``get_default_cache_dir()``.
+
+    Returns
+    -------
+    throughput_history : dict
+        Maps mirror names to ``{"bytes_per_second": ..., "samples": ...}``. Empty if no
+        history is available.
+    """
+    history_uri = os.path.join(cache_dir or get_default_cache_dir(), THROUGHPUT_HISTORY_FILENAME)
+
+    try:
+        with open(history_uri, "r", encoding="utf-8") as f_in:
+            throughput_history = json.load(f_in)
+
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(throughput_history, dict):
+        return {}
+
+    return {
+        mirror_name: mirror_history
+        for mirror_name, mirror_history in throughput_history.items()
+        if _is_valid_mirror_history(mirror_history)
+    }
+
+
+def get_download_throughput(url: str, cache_dir: t.Optional[str] = None) -> t.Optional[float]:
+    """Get the historical download throughput from the mirror of `url`, in bytes per second."""
+    mirror_history = read_throughput_history(cache_dir).get(get_mirror_name(url))
+
+    if not mirror_history:
+        return None
+
+    return float(mirror_history["bytes_per_second"])
+
+
+def record_download_throughput(
+    url: str,
+    size_in_bytes: int,
+    elapsed_seconds: float,
+    cache_dir: t.Optional[str] = None,
+) -> None:
+    """Record a download in the throughput history of its mirror.
+
+    Downloads smaller than 1 MiB are ignored, since their duration is dominated by latency.
+    Failures are ignored as well, since the history is optional. Set the environment variable
+    ``BUSCADOR_DISABLE_THROUGHPUT_HISTORY=1`` to disable the history altogether.
+
+    Parameters
+    ----------
+    url : str
+        Downloaded URL.
+
+    size_in_bytes : int
+        Downloaded size, in bytes.
+
+    elapsed_seconds : float
+        Download duration, in seconds.
+
+    cache_dir : str or None, default=None
+        Cache directory. If None, use ``get_default_cache_dir()``.
+
+    Returns
+    -------
+    None
+    """
+    if os.environ.get(THROUGHPUT_HISTORY_OPT_OUT_ENV, "").strip() not in ("", "0"):
+        return
+
+    mirror_name = get_mirror_name(url)
+
+    if size_in_bytes < THROUGHPUT_MIN_SAMPLE_SIZE_IN_BYTES or elapsed_seconds <= 0.0:
+        return
+
+    if not mirror_name:
+        return
+
+    cache_dir = cache_dir or get_default_cache_dir()
+    throughput_history = read_throughput_history(cache_dir)
+    bytes_per_second = size_in_bytes / elapsed_seconds
+
+    mirror_history = throughput_history.get(mirror_name)
+
+    if mirror_history:
+        bytes_per_second = (
+            THROUGHPUT_SMOOTHING_FACTOR * bytes_per_second
+            + (1.0 - THROUGHPUT_SMOOTHING_FACTOR) * float(mirror_history["bytes_per_second"])
+        )
+
+    throughput_history[mirror_name] = {
+        "bytes_per_second": bytes_per_second,
+        "samples": int(mirror_history["samples"]) + 1 if mirror_history else 1,
+    }
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        f_tmp_fd, f_tmp_uri = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(f_tmp_fd, "w", encoding="utf-8") as f_out:
+            json.dump(throughput_history, f_out)
+
+        os.replace(f_tmp_uri, os.path.join(cache_dir, THROUGHPUT_HISTORY_FILENAME))
+
+    except OSError:
+        pass
+
+    finally:
+        if os.path.isfile(f_tmp_uri):
+            os.remove(f_tmp_uri)
@@ -0,0 +1,11 @@
+"""Shared test fixtures."""
+import pathlib
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fixture_isolated_user_cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep per-user caches (e.g., throughput history) out of the real ``~/.cache``."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "user_cache"))
+    monkeypatch.delenv("BUSCADOR_DISABLE_THROUGHPUT_HISTORY", raising=False)
@@ -0,0 +1,225 @@
+"""Check offline bundle creation and installation."""
+import json
+import hashlib
+import pathlib
+import zipfile
+
+import pytest
+
+import buscador
+from buscador import bundle
+
+
+def sha256(uri: pathlib.Path) -> str:
+    return hashlib.sha256(uri.read_bytes()).hexdigest()
+
+
+@pytest.fixture(name="cache_dir")
+def fixture_cache_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+
+    with zipfile.ZipFile(cache_dir / "zipped_resource.zip", "w") as f_zip:
+        f_zip.writestr("zipped_resource/config.json", '{"layers": 2}')
+        f_zip.writestr("zipped_resource/vocab.txt", "\n".join(map(str, range(1000))))
+
+    (cache_dir / "binary_resource.pt").write_bytes(b"\x00\x01" * 10000)
+
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {
+            "zipped_resource": {
+                "sha256": sha256(cache_dir / "zipped_resource.zip"),
+                "file_extension": ".zip",
+                "urls": [],
+            },
+            "binary_resource": {
+                "sha256": sha256(cache_dir / "binary_resource.pt"),
+                "file_extension": ".pt",
+                "urls": [],
+            },
+        },
+    )
+
+    return cache_dir
+
+
+def test_create_and_install_bundle(tmp_path: pathlib.Path, cache_dir: pathlib.Path):
+    bundle_uri = tmp_path / "bundle.zip"
+
+    bundle.create_bundle(
+        str(bundle_uri),
+        resources=[("test_task", "zipped_resource"), ("test_task", "binary_resource")],
+        cache_dir=str(cache_dir),
+        show_progress_bar=False,
+    )
+
+    assert set(bundle.read_bundle_index(str(bundle_uri))["test_task"]) == {
+        "zipped_resource",
+        "binary_resource",
+    }
+
+    output_dir = tmp_path / "output"
+    installed_resources = bundle.install_bundle(str(bundle_uri), output_dir=str(output_dir))
+
+    assert sorted(installed_resources) == [
+        ("test_task", "binary_resource"),
+        ("test_task", "zipped_resource"),
+    ]
+    assert (output_dir / "zipped_resource" / "config.json").is_file()
+    assert not (output_dir / "zipped_resource.zip").exists()
+    assert sha256(output_dir / "binary_resource.pt") == sha256(cache_dir / "binary_resource.pt")
+
+
+def test_tampered_bundle_is_not_installed(tmp_path: pathlib.Path, cache_dir: pathlib.Path):
+    bundle_uri = tmp_path / "bundle.zip"
+
+    bundle.create_bundle(
+        str(bundle_uri),
+        resources=[("test_task", "binary_resource")],
+        cache_dir=str(cache_dir),
+        show_progress_bar=False,
+    )
+
+    bundle_data = bytearray(bundle_uri.read_bytes())
+    bundle_data[bundle_data.index(b"\x00\x01\x00\x01")] = 0xFF
+    bundle_uri.write_bytes(bytes(bundle_data))
+
+    output_dir = tmp_path / "output"
+
+    with pytest.warns(RuntimeWarning):
+        installed_resources = bundle.install_bundle(str(bundle_uri), output_dir=str(output_dir))
+
+    assert not installed_resources
+    assert not list(output_dir.iterdir())
+
+
+def test_unknown_resource_raises_value_error(tmp_path: pathlib.Path):
+    with pytest.raises(ValueError):
+        bundle.create_bundle(
+            str(tmp_path / "bundle.zip"),
+            resources=[("legal_text_segmentation", "unknown_resource_name")],
+        )
+
+    assert not (tmp_path / "bundle.zip").exists()
+
+
+def write_bundle(bundle_uri: pathlib.Path, resource_index: dict, members: dict) -> None:
+    with zipfile.ZipFile(bundle_uri, "w") as f_bundle:
+        f_bundle.writestr(
+            bundle.BUNDLE_INDEX_NAME,
+            json.dumps({"version": bundle.BUNDLE_FORMAT_VERSION, "resources": resource_index}),
+        )
+
+        for member_name, content in members.items():
+            f_bundle.writestr(member_name, content)
+
+
+@pytest.mark.parametrize("trust_bundle_registry", (False, True))
+def test_bundle_can_not_write_outside_output_dir(
+    tmp_path: pathlib.Path, trust_bundle_registry: bool
+):
+    content = b"escaped"
+    bundle_uri = tmp_path / "bundle.zip"
+    write_bundle(
+        bundle_uri,
+        {
+            "test_task": {
+                "../../escaped": {
+                    "sha256": hashlib.sha256(content).hexdigest(),
+                    "file_extension": ".bin",
+                    "urls": [],
+                },
+            },
+        },
+        {"resources/test_task/../../escaped.bin": content},
+    )
+
+    output_dir = tmp_path / "out" / "inner"
+
+    with pytest.warns(RuntimeWarning):
+        installed_resources = bundle.install_bundle(
+            str(bundle_uri),
+            output_dir=str(output_dir),
+            trust_bundle_registry=trust_bundle_registry,
+        )
+
+    assert not installed_resources
+    assert not list(tmp_path.rglob("escaped.bin"))
+    assert not list(output_dir.iterdir())
+
+
+def test_unregistered_resources_require_trust(tmp_path: pathlib.Path):
+    content = b"\x00" * 100
+    bundle_uri = tmp_path / "bundle.zip"
+    write_bundle(
+        bundle_uri,
+        {
+            "other_task": {
+                "unregistered": {
+                    "sha256": hashlib.sha256(content).hexdigest(),
+                    "file_extension": ".bin",
+                    "urls": [],
+                },
+            },
+        },
+        {"resources/other_task/unregistered.bin": content},
+    )
+
+    with pytest.warns(RuntimeWarning, match="Skipping it"):
+        assert not bundle.install_bundle(str(bundle_uri), output_dir=str(tmp_path / "a"))
+
+    with pytest.warns(RuntimeWarning, match="bundle registry entry instead"):
+        installed_resources = bundle.install_bundle(
+            str(bundle_uri), output_dir=str(tmp_path / "b"), trust_bundle_registry=True
+        )
+
+    assert installed_resources == [("other_task", "unregistered")]
+    assert (tmp_path / "b" / "unregistered.bin").read_bytes() == content
+
+
+def test_missing_bundle_member_is_not_installed(tmp_path: pathlib.Path, cache_dir: pathlib.Path):
+    bundle_uri = tmp_path / "bundle.zip"
+    resource_index = {
+        "test_task": {
+            resource_name: buscador.DEFAULT_URIS["test_task"][resource_name]
+            for resource_name in ("zipped_resource", "binary_resource")
+        },
+    }
+    write_bundle(
+        bundle_uri,
+        resource_index,
+        {"resources/test_task/binary_resource.pt": (cache_dir / "binary_resource.pt").read_bytes()},
+    )
+
+    output_dir = tmp_path / "output"
+
+    with pytest.warns(RuntimeWarning, match="zipped_resource"):
+        installed_resources = bundle.install_bundle(str(bundle_uri), output_dir=str(output_dir))
+
+    assert installed_resources == [("test_task", "binary_resource")]
+    assert sorted(path.name for path in output_dir.iterdir()) == ["binary_resource.pt"]
+
+
+def test_corrupted_archive_is_not_installed(tmp_path: pathlib.Path, cache_dir: pathlib.Path):
+    bundle_uri = tmp_path / "bundle.zip"
+    binary_content = (cache_dir / "binary_resource.pt").read_bytes()
+    write_bundle(
+        bundle_uri,
+        {"test_task": dict(buscador.DEFAULT_URIS["test_task"])},
+        {
+            "resources/test_task/zipped_resource.zip": b"not a zip file",
+            "resources/test_task/binary_resource.pt": binary_content,
+        },
+    )
+
+    output_dir = tmp_path / "output"
+
+    with pytest.warns(RuntimeWarning, match="zipped_resource"):
+        installed_resources = bundle.install_bundle(
+            str(bundle_uri), output_dir=str(output_dir), check_resource_hash=False
+        )
+
+    assert installed_resources == [("test_task", "binary_resource")]
+    assert sorted(path.name for path in output_dir.iterdir()) == ["binary_resource.pt"]
@@ -0,0 +1,190 @@
+"""Check content-defined chunking, deduplication and chunk-based resource retrieval."""
+import os
+import random
+import hashlib
+import pathlib
+
+import pytest
+
+import buscador
+from buscador import chunk_store
+
+
+def build_store(root_dir: str) -> chunk_store.ChunkStore:
+    return chunk_store.ChunkStore(
+        root_dir, min_chunk_size=512, avg_chunk_size=2048, max_chunk_size=8192
+    )
+
+
+def random_bytes(rng: random.Random, size: int) -> bytes:
+    return rng.getrandbits(8 * size).to_bytes(size, "little")
+
+
+def write_random_file(uri: str, *blocks: bytes) -> str:
+    with open(uri, "wb") as f_out:
+        for block in blocks:
+            f_out.write(block)
+    return uri
+
+
+@pytest.fixture(name="shared_block")
+def fixture_shared_block() -> bytes:
+    return random_bytes(random.Random(0), 64 * 1024)
+
+
+def test_chunks_rebuild_original_file(tmp_path: pathlib.Path, shared_block: bytes):
+    store = build_store(str(tmp_path / "store"))
+    file_uri = write_random_file(str(tmp_path / "a.bin"), shared_block)
+
+    chunk_list = store.add_file(file_uri)
+
+    assert len(chunk_list) > 1
+    assert all(512 <= item["size"] <= 8192 for item in chunk_list[:-1])
+    assert sum(item["size"] for item in chunk_list) == len(shared_block)
+
+    output_uri = str(tmp_path / "rebuilt.bin")
+    store.assemble(chunk_list, output_uri)
+
+    with open(output_uri, "rb") as f_in:
+        assert f_in.read() == shared_block
+
+
+def test_chunk_boundaries_span_read_blocks(tmp_path: pathlib.Path, shared_block: bytes):
+    file_uri = write_random_file(str(tmp_path / "a.bin"), shared_block)
+    anchor_length = chunk_store.get_anchor_length(512, 2048)
+
+    expected_chunks = []
+    data = shared_block
+
+    while data:
+        cut_point = chunk_store.find_cut_point(data, 512, 8192, anchor_length)
+        expected_chunks.append(data[:cut_point])
+        data = data[cut_point:]
+
+    chunks = list(chunk_store.iter_file_chunks(file_uri, 512, 2048, 8192))
+
+    assert chunks == expected_chunks
+    assert 1024 <= len(shared_block) / len(chunks) <= 4096
+
+
+def test_shared_content_is_deduplicated(tmp_path: pathlib.Path, shared_block: bytes):
+    store = build_store(str(tmp_path / "store"))
+    rng = random.Random(1)
+
+    uri_a = write_random_file(str(tmp_path / "a.bin"), random_bytes(rng, 3000), shared_block)
+    uri_b = write_random_file(str(tmp_path / "b.bin"), random_bytes(rng, 5000), shared_block)
+
+    chunks_a = store.add_file(uri_a)
+    chunks_b = build_store(str(tmp_path / "store_b")).add_file(uri_b)
+    missing_before_b = store.missing_chunks(chunks_b)
+
+    assert 0 < len(missing_before_b) <= len(chunks_b) // 2
+
+    assert store.add_file(uri_b) == chunks_b
+    assert not store.missing_chunks(chunks_b)
+
+    shared = {item["sha256"] for item in chunks_a} & {item["sha256"] for item in chunks_b}
+    stored_chunk_count = sum(len(files) for _, _, files in os.walk(store.root_dir))
+
+    assert len(shared) >= len(chunks_b) // 2
+    assert stored_chunk_count == len({item["sha256"] for item in chunks_a + chunks_b})
+
+
+def test_fetch_only_missing_chunks(tmp_path: pathlib.Path, shared_block: bytes):
+    remote = build_store(str(tmp_path / "remote"))
+    local = build_store(str(tmp_path / "local"))
+
+    chunk_list = remote.add_file(write_random_file(str(tmp_path / "a.bin"), shared_block))
+    with open(remote.chunk_path(chunk_list[0]["sha256"]), "rb") as f_in:
+        local.add_chunk(f_in.read())
+
+    assert len(local.missing_chunks(chunk_list)) == len(chunk_list) - 1
+
+    chunk_urls = [(tmp_path / "nowhere").as_uri(), pathlib.Path(remote.root_dir).as_uri()]
+    local.fetch_chunks(chunk_list, chunk_urls=chunk_urls, show_progress_bar=False)
+
+    assert not local.missing_chunks(chunk_list)
+
+
+def test_missing_chunk_raises_connection_error(tmp_path: pathlib.Path):
+    store = build_store(str(tmp_path / "store"))
+
+    with pytest.raises(ConnectionError):
+        store.fetch_chunks(
+            [{"sha256": hashlib.sha256(b"missing").hexdigest(), "size": 7}],
+            chunk_urls=[(tmp_path / "nowhere").as_uri()],
+            show_progress_bar=False,
+        )
+
+
+def test_download_resource_from_chunk_list(
+    tmp_path: pathlib.Path, shared_block: bytes, monkeypatch: pytest.MonkeyPatch
+):
+    remote = build_store(str(tmp_path / "remote"))
+    chunk_list = remote.add_file(write_random_file(str(tmp_path / "res.bin"), shared_block))
+    chunk_urls = [pathlib.Path(remote.root_dir).as_uri()]
+
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {
+            "chunked_resource": {
+                "sha256": hashlib.sha256(shared_block).hexdigest(),
+                "file_extension": ".bin",
+                "urls": [],
+                "chunks": {"urls": chunk_urls, "list": chunk_list},
+            },
+        },
+    )
+
+    output_dir = tmp_path / "output"
+
+    has_succeed = buscador.download_resource(
+        task_name="test_task",
+        resource_name="chunked_resource",
+        output_dir=str(output_dir),
+        show_progress_bar=False,
+        chunk_store_dir=str(tmp_path / "local"),
+    )
+
+    assert has_succeed
+    assert (output_dir / "chunked_resource.bin").read_bytes() == shared_block
+
+
+@pytest.mark.parametrize(
+    "chunks_config", [{"urls": []}, {"list": []}, {"urls": [], "list": [{"size": 7}]}]
+)
+def test_malformed_chunk_list_falls_back_to_urls(
+    tmp_path: pathlib.Path,
+    shared_block: bytes,
+    monkeypatch: pytest.MonkeyPatch,
+    chunks_config: dict,
+):
+    resource_uri = write_random_file(str(tmp_path / "res.bin"), shared_block)
+
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {
+            "chunked_resource": {
+                "sha256": hashlib.sha256(shared_block).hexdigest(),
+                "file_extension": ".bin",
+                "urls": [pathlib.Path(resource_uri).as_uri()],
+                "chunks": chunks_config,
+            },
+        },
+    )
+
+    output_dir = tmp_path / "output"
+
+    with pytest.warns(RuntimeWarning, match="Malformed 'chunks' registry entry"):
+        has_succeed = buscador.download_resource(
+            task_name="test_task",
+            resource_name="chunked_resource",
+            output_dir=str(output_dir),
+            show_progress_bar=False,
+            chunk_store_dir=str(tmp_path / "local"),
+        )
+
+    assert has_succeed
+    assert (output_dir / "chunked_resource.bin").read_bytes() == shared_block
@@ -0,0 +1,195 @@
+"""Check atomic and safe extraction of compressed resources."""
+import io
+import os
+import time
+import shutil
+import pathlib
+import tarfile
+import zipfile
+
+import pytest
+
+from buscador import decompress
+from buscador import download_resources
+
+
+def create_zip(zip_uri: pathlib.Path, members: dict) -> None:
+    with zipfile.ZipFile(zip_uri, "w") as f_zip:
+        for member_name, content in members.items():
+            f_zip.writestr(member_name, content)
+
+
+def add_tar_member(f_tar: tarfile.TarFile, member: tarfile.TarInfo, content: bytes = b"") -> None:
+    member.size = len(content)
+    f_tar.addfile(member, io.BytesIO(content) if content else None)
+
+
+@pytest.mark.parametrize("clean_compressed_files", (False, True))
+def test_decompress_zip(tmp_path: pathlib.Path, clean_compressed_files: bool):
+    create_zip(
+        tmp_path / "resource.zip",
+        {"resource/a.txt": b"a" * 1000, "resource/sub/b.txt": b"b", "resource/empty.txt": b""},
+    )
+
+    decompress.decompress(
+        str(tmp_path / "resource.zip"), clean_compressed_files=clean_compressed_files
+    )
+
+    assert (tmp_path / "resource" / "a.txt").read_bytes() == b"a" * 1000
+    assert (tmp_path / "resource" / "sub" / "b.txt").read_bytes() == b"b"
+    assert (tmp_path / "resource" / "empty.txt").read_bytes() == b""
+    assert (tmp_path / "resource.zip").exists() != clean_compressed_files
+    assert sorted(os.listdir(tmp_path)) == ["resource"] + (
+        [] if clean_compressed_files else ["resource.zip"]
+    )
+
+
+def test_decompress_tar_with_links(tmp_path: pathlib.Path):
+    with tarfile.open(tmp_path / "resource.tar", "w") as f_tar:
+        add_tar_member(f_tar, tarfile.TarInfo("resource/data/a.txt"), b"content")
+
+        member = tarfile.TarInfo("resource/link.txt")
+        member.type = tarfile.SYMTYPE
+        member.linkname = "data/a.txt"
+        add_tar_member(f_tar, member)
+
+        member = tarfile.TarInfo("resource/hardlink.txt")
+        member.type = tarfile.LNKTYPE
+        member.linkname = "resource/data/a.txt"
+        add_tar_member(f_tar, member)
+
+    decompress.decompress(str(tmp_path / "resource.tar"), sync_to_disk=False)
+
+    assert (tmp_path / "resource" / "link.txt").read_bytes() == b"content"
+    assert (tmp_path / "resource" / "hardlink.txt").read_bytes() == b"content"
+    assert os.path.islink(tmp_path / "resource" / "link.txt")
+
+
+def test_decompress_tar_rooted_at_current_dir(tmp_path: pathlib.Path):
+    source_dir = tmp_path / "source"
+    (source_dir / "resource").mkdir(parents=True)
+    (source_dir / "resource" / "a.txt").write_bytes(b"a")
+    (tmp_path / "output").mkdir()
+
+    # Note: equivalent to 'tar -C source -cf resource.tar .', whose first member is './'.
+    with tarfile.open(tmp_path / "output" / "resource.tar", "w") as f_tar:
+        f_tar.add(source_dir, arcname=".")
+
+    with tarfile.open(tmp_path / "output" / "resource.tar") as f_tar:
+        assert f_tar.getnames()[0] == "."
+
+    decompress.decompress(str(tmp_path / "output" / "resource.tar"))
+
+    assert (tmp_path / "output" / "resource" / "a.txt").read_bytes() == b"a"
+    assert sorted(os.listdir(tmp_path / "output")) == ["resource", "resource.tar"]
+
+
+def test_decompress_rejects_file_at_root(tmp_path: pathlib.Path):
+    with tarfile.open(tmp_path / "resource.tar", "w") as f_tar:
+        add_tar_member(f_tar, tarfile.TarInfo("./"), b"content")
+
+    with pytest.raises(decompress.UnsafeArchiveError):
+        decompress.decompress(str(tmp_path / "resource.tar"))
+
+    assert sorted(os.listdir(tmp_path)) == ["resource.tar"]
+
+
+@pytest.mark.parametrize("member_name", ["../evil.txt", "resource/../../evil.txt", "/evil.txt"])
+def test_decompress_rejects_path_traversal(tmp_path: pathlib.Path, member_name: str):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    create_zip(output_dir / "resource.zip", {"resource/a.txt": b"a", member_name: b"evil"})
+
+    with pytest.raises(decompress.UnsafeArchiveError):
+        decompress.decompress(str(output_dir / "resource.zip"))
+
+    assert not (tmp_path / "evil.txt").exists()
+    assert sorted(os.listdir(output_dir)) == ["resource.zip"]
+
+
+@pytest.mark.parametrize("linkname", ["../../outside", "/etc/passwd"])
+def test_decompress_rejects_links_outside(tmp_path: pathlib.Path, linkname: str):
+    with tarfile.open(tmp_path / "resource.tar", "w") as f_tar:
+        member = tarfile.TarInfo("resource/link")
+        member.type = tarfile.SYMTYPE
+        member.linkname = linkname
+        add_tar_member(f_tar, member)
+
+    with pytest.raises(decompress.UnsafeArchiveError):
+        decompress.decompress(str(tmp_path / "resource.tar"))
+
+    assert sorted(os.listdir(tmp_path)) == ["resource.tar"]
+
+
+def test_interrupted_decompression_is_not_cached(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    create_zip(tmp_path / "resource.zip", {"resource/a.txt": b"a", "resource/b.txt": b"b"})
+    fn_copyfileobj = shutil.copyfileobj
+    n_calls = []
+
+    def interrupted_copyfileobj(*args, **kwargs):
+        n_calls.append(None)
+
+        if len(n_calls) > 1:
+            raise KeyboardInterrupt
+
+        return fn_copyfileobj(*args, **kwargs)
+
+    monkeypatch.setattr(shutil, "copyfileobj", interrupted_copyfileobj)
+
+    with pytest.raises(KeyboardInterrupt):
+        decompress.decompress(str(tmp_path / "resource.zip"))
+
+    assert sorted(os.listdir(tmp_path)) == ["resource.zip"]
+    assert not download_resources.is_cached(str(tmp_path / "resource.zip"))
+
+    monkeypatch.setattr(shutil, "copyfileobj", fn_copyfileobj)
+    decompress.decompress(str(tmp_path / "resource.zip"))
+
+    assert (tmp_path / "resource" / "b.txt").read_bytes() == b"b"
+    assert download_resources.is_cached(str(tmp_path / "resource.zip"))
+
+
+def test_decompress_merges_shared_directories(tmp_path: pathlib.Path):
+    create_zip(tmp_path / "bert_v1.zip", {"models/bert_v1/weights.bin": b"v1"})
+    create_zip(tmp_path / "bert_v2.zip", {"models/bert_v2/weights.bin": b"v2"})
+
+    decompress.decompress(str(tmp_path / "bert_v1.zip"))
+    decompress.decompress(str(tmp_path / "bert_v2.zip"))
+
+    assert sorted(os.listdir(tmp_path / "models")) == ["bert_v1", "bert_v2"]
+    assert (tmp_path / "models" / "bert_v1" / "weights.bin").read_bytes() == b"v1"
+    assert (tmp_path / "models" / "bert_v2" / "weights.bin").read_bytes() == b"v2"
+
+
+def test_decompress_replaces_previous_extraction(tmp_path: pathlib.Path):
+    (tmp_path / "resource" / "sub").mkdir(parents=True)
+    (tmp_path / "resource" / "a.txt").write_bytes(b"previous")
+    (tmp_path / "resource" / "other.txt").write_bytes(b"other")
+    (tmp_path / "resource" / "sub" / "b.txt").write_bytes(b"previous")
+    create_zip(tmp_path / "resource.zip", {"resource/a.txt": b"a", "resource/sub": b"sub"})
+
+    decompress.decompress(str(tmp_path / "resource.zip"))
+
+    assert sorted(os.listdir(tmp_path / "resource")) == ["a.txt", "other.txt", "sub"]
+    assert (tmp_path / "resource" / "a.txt").read_bytes() == b"a"
+    assert (tmp_path / "resource" / "other.txt").read_bytes() == b"other"
+    assert (tmp_path / "resource" / "sub").read_bytes() == b"sub"
+    assert sorted(os.listdir(tmp_path)) == ["resource", "resource.zip"]
+
+
+def test_decompress_keeps_recent_staging_dirs(tmp_path: pathlib.Path):
+    stale_mtime = time.time() - decompress.STALE_STAGING_DIR_AGE_IN_SECONDS - 60
+    (tmp_path / ".resource.zip.staging-stale").mkdir()
+    os.utime(tmp_path / ".resource.zip.staging-stale", (stale_mtime, stale_mtime))
+    (tmp_path / ".resource.zip.staging-concurrent").mkdir()
+    create_zip(tmp_path / "resource.zip", {"resource/a.txt": b"a"})
+
+    decompress.decompress(str(tmp_path / "resource.zip"))
+
+    assert sorted(os.listdir(tmp_path)) == [
+        ".resource.zip.staging-concurrent",
+        "resource",
+        "resource.zip",
+    ]
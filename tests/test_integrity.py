@@ -0,0 +1,132 @@
+"""Check hash engines and alternative digests used to verify resources."""
+import typing as t
+import os
+import random
+import hashlib
+import pathlib
+import zipfile
+import warnings
+
+import pytest
+
+import buscador
+from buscador import integrity
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def get_random_bytes(size: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return rng.getrandbits(8 * size).to_bytes(size, "little")
+
+
+@pytest.fixture(name="resource_uri")
+def fixture_resource_uri(tmp_path: pathlib.Path) -> str:
+    resource_uri = tmp_path / "resource.bin"
+    resource_uri.write_bytes(get_random_bytes(5 * CHUNK_SIZE + 123))
+    return str(resource_uri)
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE, 3 * CHUNK_SIZE + 1])
+def test_sha256_chunks(tmp_path: pathlib.Path, size: int):
+    data = get_random_bytes(size)
+    (tmp_path / "file.bin").write_bytes(data)
+
+    chunk_hashes = integrity.compute_sha256_chunks(
+        str(tmp_path / "file.bin"), chunk_size=CHUNK_SIZE, n_jobs=3
+    )
+
+    expected = [
+        hashlib.sha256(data[i : i + CHUNK_SIZE]).hexdigest()
+        for i in range(0, max(1, size), CHUNK_SIZE)
+    ]
+
+    assert chunk_hashes == expected
+
+
+def test_blake2b_tree_is_independent_of_n_jobs(resource_uri: str):
+    tree_hashes = {
+        integrity.compute_blake2b_tree(resource_uri, chunk_size=CHUNK_SIZE, n_jobs=n_jobs)
+        for n_jobs in (1, 2, 8)
+    }
+
+    assert len(tree_hashes) == 1
+
+
+def test_blake2b_tree_depends_on_chunk_size(resource_uri: str):
+    assert integrity.compute_blake2b_tree(
+        resource_uri, chunk_size=CHUNK_SIZE
+    ) != integrity.compute_blake2b_tree(resource_uri, chunk_size=2 * CHUNK_SIZE)
+
+
+@pytest.mark.parametrize("hash_engine", integrity.HASH_ENGINES)
+def test_verify_resource(resource_uri: str, hash_engine: str):
+    resource_config = integrity.compute_resource_digests(resource_uri, chunk_size=CHUNK_SIZE)
+
+    assert integrity.verify_resource(resource_uri, resource_config, hash_engine=hash_engine)
+
+    with open(resource_uri, "r+b") as f_out:
+        f_out.seek(3 * CHUNK_SIZE + 7)
+        f_out.write(b"\x00\xff")
+
+    assert not integrity.verify_resource(resource_uri, resource_config, hash_engine=hash_engine)
+
+
+@pytest.mark.parametrize("hash_engine", integrity.ALTERNATIVE_DIGESTS)
+def test_verify_truncated_resource(resource_uri: str, hash_engine: str):
+    resource_config = integrity.compute_resource_digests(resource_uri, chunk_size=CHUNK_SIZE)
+
+    with open(resource_uri, "r+b") as f_out:
+        f_out.truncate(4 * CHUNK_SIZE)
+
+    assert not integrity.verify_resource(resource_uri, resource_config, hash_engine=hash_engine)
+
+
+def test_verify_resource_falls_back_to_sha256(resource_uri: str):
+    resource_config = {"sha256": integrity.compute_resource_hash(resource_uri)}
+
+    for hash_engine in integrity.HASH_ENGINES:
+        assert integrity.verify_resource(resource_uri, resource_config, hash_engine=hash_engine)
+
+
+def test_verify_resource_unknown_engine(resource_uri: str):
+    with pytest.raises(ValueError):
+        integrity.verify_resource(resource_uri, {"sha256": ""}, hash_engine="md5")
+
+
+@pytest.mark.parametrize("hash_engine", integrity.HASH_ENGINES)
+def test_download_resource_with_hash_engine(
+    tmp_path: pathlib.Path, monkeypatch: t.Any, hash_engine: str
+):
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    source_uri = source_dir / "resource.zip"
+
+    with zipfile.ZipFile(source_uri, "w") as f_zip:
+        f_zip.writestr("resource/content.bin", get_random_bytes(3 * CHUNK_SIZE))
+
+    resource_config = integrity.compute_resource_digests(str(source_uri), chunk_size=CHUNK_SIZE)
+    resource_config["blake2b_tree"]["digest"] = "0" * 64
+
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {"resource": {**resource_config, "file_extension": ".zip", "urls": []}},
+    )
+
+    output_dir = tmp_path / "output"
+
+    with warnings.catch_warnings(record=True):
+        has_succeed = buscador.download_resource(
+            task_name="test_task",
+            resource_name="resource",
+            output_dir=str(output_dir),
+            show_progress_bar=False,
+            mirror_urls=[source_dir.as_uri()],
+            hash_engine=hash_engine,
+        )
+
+    # Note: the registered BLAKE2b tree digest is (purposely) wrong.
+    assert has_succeed == (hash_engine != "blake2b_tree")
+    assert os.path.isdir(output_dir / "resource") == has_succeed
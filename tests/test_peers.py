@@ -0,0 +1,179 @@
+"""Check local network cache sharing between nodes."""
+import typing as t
+import hashlib
+import pathlib
+import threading
+import zipfile
+import warnings
+import urllib.error
+import urllib.request
+
+import pytest
+import pytest_socket
+
+import buscador
+from buscador import peers
+
+
+RESOURCE_CONTENT = b"ulysses" * 4096
+
+
+@pytest.fixture(name="registry", autouse=True)
+def fixture_registry(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    pytest_socket.enable_socket()
+
+    upstream_uri = tmp_path / "upstream" / "shared_resource.bin"
+    upstream_uri.parent.mkdir()
+    upstream_uri.write_bytes(RESOURCE_CONTENT)
+
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {
+            "shared_resource": {
+                "sha256": hashlib.sha256(RESOURCE_CONTENT).hexdigest(),
+                "file_extension": ".bin",
+                "urls": [upstream_uri.as_uri()],
+            },
+        },
+    )
+
+    return upstream_uri
+
+
+def start_peer(cache_dir: pathlib.Path) -> t.Tuple[peers.CacheServer, threading.Thread]:
+    cache_dir.mkdir(exist_ok=True)
+    server = peers.CacheServer(
+        ("127.0.0.1", 0), cache_dir=str(cache_dir), resource_configs=buscador.DEFAULT_URIS
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+@pytest.fixture(name="peer_servers")
+def fixture_peer_servers(tmp_path: pathlib.Path) -> t.Iterator[t.List[peers.CacheServer]]:
+    servers = []
+
+    for i in range(3):
+        server, _ = start_peer(tmp_path / f"peer_{i}")
+        servers.append(server)
+
+    yield servers
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_download_from_peer(
+    tmp_path: pathlib.Path, registry: pathlib.Path, peer_servers: t.List[peers.CacheServer]
+):
+    (tmp_path / "peer_1" / "shared_resource.bin").write_bytes(RESOURCE_CONTENT)
+    registry.unlink()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+
+        has_succeed = buscador.download_resource(
+            task_name="test_task",
+            resource_name="shared_resource",
+            output_dir=str(tmp_path / "output"),
+            show_progress_bar=False,
+            peer_urls=[server.url for server in peer_servers],
+        )
+
+    assert has_succeed
+    assert (tmp_path / "output" / "shared_resource.bin").read_bytes() == RESOURCE_CONTENT
+
+
+def test_peer_does_not_serve_unverified_files(
+    tmp_path: pathlib.Path, peer_servers: t.List[peers.CacheServer]
+):
+    (tmp_path / "peer_0" / "shared_resource.bin").write_bytes(b"tampered")
+
+    with pytest.raises(urllib.error.HTTPError):
+        urllib.request.urlopen(  # pylint: disable='consider-using-with'
+            peers.get_peer_resource_url(peer_servers[0].url, "test_task", "shared_resource")
+        )
+
+    has_succeed = buscador.download_resource(
+        task_name="test_task",
+        resource_name="shared_resource",
+        output_dir=str(tmp_path / "output"),
+        show_progress_bar=False,
+        peer_urls=[server.url for server in peer_servers],
+    )
+
+    assert has_succeed
+    assert (tmp_path / "output" / "shared_resource.bin").read_bytes() == RESOURCE_CONTENT
+
+
+def test_unreachable_peers_fall_back_to_upstream(tmp_path: pathlib.Path):
+    server = peers.CacheServer(("127.0.0.1", 0), cache_dir=str(tmp_path), resource_configs={})
+    stopped_peer_url = server.url
+    server.server_close()
+
+    has_succeed = buscador.download_resource(
+        task_name="test_task",
+        resource_name="shared_resource",
+        output_dir=str(tmp_path / "output"),
+        show_progress_bar=False,
+        peer_urls=[stopped_peer_url],
+        timeout_limit_seconds=1,
+    )
+
+    assert has_succeed
+
+
+@pytest.mark.parametrize("clean_compressed_files", (None, True))
+def test_peer_downloads_are_kept_to_be_shared(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    peer_servers: t.List[peers.CacheServer],
+    clean_compressed_files: t.Optional[bool],
+):
+    with zipfile.ZipFile(tmp_path / "peer_0" / "zipped_resource.zip", "w") as f_zip:
+        f_zip.writestr("zipped_resource/content.txt", RESOURCE_CONTENT)
+
+    zip_content = (tmp_path / "peer_0" / "zipped_resource.zip").read_bytes()
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS["test_task"],
+        "zipped_resource",
+        {"sha256": hashlib.sha256(zip_content).hexdigest(), "file_extension": ".zip", "urls": []},
+    )
+
+    has_succeed = buscador.download_resource(
+        task_name="test_task",
+        resource_name="zipped_resource",
+        output_dir=str(tmp_path / "output"),
+        show_progress_bar=False,
+        clean_compressed_files=clean_compressed_files,
+        peer_urls=[peer_servers[0].url],
+    )
+
+    assert has_succeed
+    assert (tmp_path / "output" / "zipped_resource" / "content.txt").is_file()
+    assert (tmp_path / "output" / "zipped_resource.zip").is_file() != bool(clean_compressed_files)
+
+    if clean_compressed_files:
+        return
+
+    server = peers.CacheServer(
+        ("127.0.0.1", 0),
+        cache_dir=str(tmp_path / "output"),
+        resource_configs=buscador.DEFAULT_URIS,
+    )
+
+    with server:
+        assert ("test_task", "zipped_resource") in server.get_servable_resources()
+        assert server.get_resource_path("test_task", "zipped_resource") is not None
+
+
+def test_serve_warns_if_nothing_is_servable(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(peers.CacheServer, "serve_forever", lambda *args, **kwargs: None)
+
+    with pytest.warns(RuntimeWarning, match="No registered resource file found"):
+        peers.serve_cache(str(tmp_path), resource_configs=buscador.DEFAULT_URIS, port=0)
@@ -0,0 +1,183 @@
+"""Check download planning and size estimates."""
+import json
+import hashlib
+import pathlib
+import zipfile
+
+import pytest
+
+import buscador
+from buscador import planning
+from buscador import user_cache
+from buscador import decompress
+
+
+@pytest.fixture(name="registry", autouse=True)
+def fixture_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {
+            "sized_resource": {
+                "sha256": "0" * 64,
+                "file_extension": ".zip",
+                "urls": ["https://mirror.example/sized_resource.zip"],
+                "size_in_bytes": 4 * 1024 * 1024,
+                "extracted_size_in_bytes": 6 * 1024 * 1024,
+            },
+            "unsized_resource": {
+                "sha256": "1" * 64,
+                "file_extension": ".pt",
+                "urls": ["https://mirror.example/unsized_resource.pt"],
+            },
+            "partially_sized_resource": {
+                "sha256": "2" * 64,
+                "file_extension": ".zip",
+                "urls": ["https://mirror.example/partially_sized_resource.zip"],
+                "size_in_bytes": 1024,
+            },
+        },
+    )
+
+
+def test_describe_resource_file(tmp_path: pathlib.Path):
+    with zipfile.ZipFile(tmp_path / "resource.zip", "w", compression=zipfile.ZIP_DEFLATED) as f_zip:
+        f_zip.writestr("resource/a.txt", "a" * 1000)
+
+    (tmp_path / "resource.pt").write_bytes(b"\x00" * 100)
+
+    zip_config = planning.describe_resource_file(str(tmp_path / "resource.zip"))
+    pt_config = planning.describe_resource_file(str(tmp_path / "resource.pt"))
+
+    zip_sha256 = hashlib.sha256((tmp_path / "resource.zip").read_bytes()).hexdigest()
+
+    assert zip_config["sha256"] == zip_sha256
+    assert zip_config["file_extension"] == ".zip"
+    assert zip_config["size_in_bytes"] == (tmp_path / "resource.zip").stat().st_size
+    assert zip_config["extracted_size_in_bytes"] == 1000
+    assert pt_config["size_in_bytes"] == 100
+    assert "extracted_size_in_bytes" not in pt_config
+
+
+def test_unknown_extracted_size_is_unknown(tmp_path: pathlib.Path):
+    plan = planning.plan_download(
+        [("test_task", "partially_sized_resource")], output_dir=str(tmp_path)
+    )
+
+    assert plan.resources[0].required_disk_space_in_bytes is None
+    assert plan.has_unknown_sizes
+    assert plan.required_disk_space_in_bytes == 1024
+    assert plan.fits_in_disk is None
+    assert planning.DownloadPlan(plan.output_dir, plan.resources, 1023).fits_in_disk is False
+
+
+def test_plan_with_throughput_history(tmp_path: pathlib.Path):
+    user_cache.record_download_throughput(
+        "https://mirror.example/other_resource.zip",
+        size_in_bytes=2 * 1024 * 1024,
+        elapsed_seconds=1.0,
+    )
+
+    output_dir = tmp_path / "output"
+    plan = planning.plan_download(
+        [("test_task", "sized_resource"), ("test_task", "unsized_resource")],
+        output_dir=str(output_dir),
+    )
+
+    sized_plan, unsized_plan = plan.resources
+
+    assert not output_dir.exists()
+    assert sized_plan.estimated_seconds == pytest.approx(2.0)
+    assert sized_plan.required_disk_space_in_bytes == 10 * 1024 * 1024
+    assert unsized_plan.download_size_in_bytes is None
+    assert plan.has_unknown_sizes
+    assert plan.estimated_seconds is None
+    assert plan.required_disk_space_in_bytes == 10 * 1024 * 1024
+    assert plan.fits_in_disk is (
+        None if plan.free_disk_space_in_bytes >= 10 * 1024 * 1024 else False
+    )
+
+
+def test_cached_resources_are_not_planned(tmp_path: pathlib.Path):
+    (tmp_path / "unsized_resource.pt").write_bytes(b"cached")
+
+    plan = planning.plan_download(
+        [("test_task", "sized_resource"), ("test_task", "unsized_resource")],
+        output_dir=str(tmp_path),
+    )
+
+    assert [resource.resource_name for resource in plan.pending_resources] == ["sized_resource"]
+    assert not plan.has_unknown_sizes
+    assert plan.download_size_in_bytes == 4 * 1024 * 1024
+    assert planning.DownloadPlan(plan.output_dir, plan.resources, 10 * 1024 * 1024).fits_in_disk
+
+
+def test_small_downloads_do_not_update_throughput():
+    user_cache.record_download_throughput(
+        "https://mirror.example/tiny_file", size_in_bytes=1024, elapsed_seconds=1.0
+    )
+
+    assert user_cache.get_download_throughput("https://mirror.example/tiny_file") is None
+
+
+def test_malformed_throughput_history_is_ignored(tmp_path: pathlib.Path):
+    history_uri = pathlib.Path(user_cache.get_default_cache_dir()) / "throughput_history.json"
+    history_uri.parent.mkdir(parents=True)
+    history_uri.write_text(
+        json.dumps(
+            {
+                "mirror.example": {"samples": 3},
+                "other.example": "garbage",
+                "valid.example": {"bytes_per_second": 1024.0, "samples": 1},
+            }
+        )
+    )
+
+    assert list(user_cache.read_throughput_history()) == ["valid.example"]
+
+    plan = planning.plan_download([("test_task", "sized_resource")], output_dir=str(tmp_path))
+    assert plan.estimated_seconds is None
+
+    user_cache.record_download_throughput(
+        "https://mirror.example/resource.zip", size_in_bytes=2 * 1024 * 1024, elapsed_seconds=1.0
+    )
+    assert user_cache.get_download_throughput("https://mirror.example/x") == 2 * 1024 * 1024
+
+
+def test_malformed_throughput_history_does_not_fail_downloads(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(user_cache, "get_mirror_name", lambda url: "mirror.example")
+    source_uri = tmp_path / "source" / "resource.bin"
+    source_uri.parent.mkdir()
+    source_uri.write_bytes(b"\x00" * (2 * 1024 * 1024))
+
+    history_uri = pathlib.Path(user_cache.get_default_cache_dir()) / "throughput_history.json"
+    history_uri.parent.mkdir(parents=True)
+    history_uri.write_text(json.dumps({"mirror.example": {"samples": 3}}))
+
+    output_uri = tmp_path / "output.bin"
+    buscador.download_resources.download_file(
+        source_uri.as_uri(), str(output_uri), show_progress_bar=False
+    )
+
+    assert output_uri.read_bytes() == source_uri.read_bytes()
+    assert user_cache.read_throughput_history()["mirror.example"]["samples"] == 1
+
+
+def test_throughput_history_opt_out(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("BUSCADOR_DISABLE_THROUGHPUT_HISTORY", "1")
+    user_cache.record_download_throughput(
+        "https://mirror.example/resource.zip", size_in_bytes=2 * 1024 * 1024, elapsed_seconds=1.0
+    )
+
+    assert not user_cache.read_throughput_history()
+
+
+def test_uncompressed_size(tmp_path: pathlib.Path):
+    with zipfile.ZipFile(tmp_path / "resource.zip", "w", compression=zipfile.ZIP_DEFLATED) as f_zip:
+        f_zip.writestr("resource/a.txt", "a" * 1000)
+        f_zip.writestr("resource/b.txt", "b" * 500)
+
+    assert decompress.get_uncompressed_size(str(tmp_path / "resource.zip")) == 1500
+    assert decompress.get_uncompressed_size(str(tmp_path / "resource.pt")) is None
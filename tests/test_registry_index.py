@@ -0,0 +1,97 @@
+"""Check the compiled registry index."""
+import pathlib
+
+import pytest
+
+import buscador
+from buscador import registry_index
+
+
+def test_index_covers_every_registered_resource():
+    index = buscador.get_registry_index()
+
+    assert len(index) == sum(len(resources) for resources in buscador.DEFAULT_URIS.values())
+
+    for task_name in buscador.get_available_tasks():
+        for resource_name in buscador.get_task_available_resources(task_name):
+            entry = index.get(task_name, resource_name)
+            assert entry is not None
+            assert index.find_by_sha256(entry.sha256.upper()) == entry
+
+
+def test_index_is_compiled_once_per_process(monkeypatch: pytest.MonkeyPatch):
+    index = buscador.get_registry_index()
+
+    assert buscador.get_registry_index() is index
+
+    monkeypatch.setitem(
+        buscador.DEFAULT_URIS,
+        "test_task",
+        {"resource": {"sha256": "0" * 64, "file_extension": ".txt", "urls": []}},
+    )
+
+    updated_index = buscador.get_registry_index()
+
+    assert updated_index is not index
+    assert len(updated_index) == len(index) + 1
+    assert buscador.get_task_available_resources("test_task") == ("resource",)
+    assert buscador.get_available_tasks()[-1] == "test_task"
+
+    monkeypatch.undo()
+
+    assert len(buscador.get_registry_index()) == len(index)
+
+    with pytest.raises(ValueError, match="Unrecognized task name 'test_task'"):
+        buscador.get_task_available_resources("test_task")
+
+
+def test_unknown_resource_suggestions():
+    with pytest.raises(ValueError, match="Did you mean .*'legal_sroberta_v1'"):
+        buscador.download_resource("sentence_similarity", "legal_sroberta_v")
+
+    with pytest.raises(ValueError, match="provide one of the following resources: .*'legal_"):
+        buscador.download_resource("sentence_similarity", "zzzzzzzz")
+
+
+def test_prefix_and_fuzzy_search():
+    index = buscador.get_registry_index()
+
+    prefix_matches = index.find_by_prefix("dataset_sp_court_cases_")
+    assert len(prefix_matches) == 10
+    assert all(entry.task_name == "probing_task" for entry in prefix_matches)
+
+    fuzzy_matches = index.search("sbert_1mil_anma", limit=1)
+    assert [entry.resource_name for entry in fuzzy_matches] == ["sbert_1mil_anama"]
+
+    assert not index.search("6000_subword_tokenizer", task_name="sentence_similarity")
+
+
+def test_filter_by_file_extension():
+    index = buscador.get_registry_index()
+
+    pt_entries = index.filter(file_extension="pt")
+
+    assert pt_entries
+    assert all(entry.file_extension == ".pt" for entry in pt_entries)
+
+
+def test_identify_file(tmp_path: pathlib.Path):
+    index = registry_index.RegistryIndex.from_resource_configs(
+        {
+            "test_task": {
+                "resource": {
+                    "sha256": "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824",
+                    "file_extension": ".txt",
+                    "urls": [],
+                },
+            },
+        }
+    )
+
+    (tmp_path / "stray_file").write_bytes(b"hello")
+    (tmp_path / "unknown_file").write_bytes(b"bye")
+
+    entry = index.identify_file(str(tmp_path / "stray_file"))
+
+    assert entry is not None and entry.resource_name == "resource"
+    assert index.identify_file(str(tmp_path / "unknown_file")) is None